@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Per-page Markdown conversion cost: fresh converter vs shared converter vs cache.
+
+"fresh" is how convert_markdown() used to work, building a new
+markdown.Markdown (and loading its extensions) for every page. "shared"
+reuses one reset() converter per process; "cached" is a repeat conversion
+served from the in-memory HTML cache, as the watch loop sees it.
+
+Usage:
+  python bench/bench_convert.py [--pages 300]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from synthetic import build_docs, synthetic_markdown
+
+
+def _per_page_us(fn, docs) -> float:
+    t0 = time.perf_counter()
+    for doc in docs:
+        fn(doc)
+    return (time.perf_counter() - t0) / len(docs) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    args = parser.parse_args()
+
+    docs = [synthetic_markdown(i) for i in range(args.pages)]
+    hashes = [build_docs._hash_text(doc) for doc in docs]
+    print(f"renderer: {build_docs.renderer_id()}, {args.pages} pages of ~{sum(map(len, docs)) // len(docs)} bytes")
+
+    results = {}
+    if build_docs.import_markdown() is not None:
+        results["fresh"] = _per_page_us(lambda d: build_docs.convert_markdown(d, build_docs.new_markdown_converter()), docs)
+    results["shared"] = _per_page_us(build_docs.convert_markdown, docs)
+    pairs = list(zip(docs, hashes))
+    build_docs.CONVERT_CACHE_SIZE = len(pairs)
+    for doc, digest in pairs:
+        build_docs.convert_markdown_cached(doc, digest)
+    results["cached"] = _per_page_us(lambda p: build_docs.convert_markdown_cached(*p), pairs)
+
+    base = results.get("fresh", results["shared"])
+    for name, us in results.items():
+        print(f"  {name:<7} {us:>9.1f} µs/page  {base / us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
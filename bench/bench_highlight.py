@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Per-block cost of build-time highlighting: Pygments vs built-in lexers vs cache.
+
+"pygments" and "builtin" lex every block afresh; "cached" runs
+highlight_code_blocks() over pages whose blocks are all in the highlight
+cache already, as a rebuild does. The on-disk cache is not touched.
+
+Usage:
+  python bench/bench_highlight.py [--blocks 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from synthetic import build_docs
+
+SNIPPETS = {
+    "c": "#include <axl.h>\n/* sum a column */\nstatic int64_t sum_{i}(const axl_t *v, size_t n) {{\n"
+         "    int64_t s = 0;\n    for (size_t j = 0; j < n; j++) s += v[j].i; // {i}\n    return s;\n}}\n",
+    "bash": "export AXL_HOME=\"$HOME/axl-{i}\"\nif [ -d \"$AXL_HOME\" ]; then\n  cd \"$AXL_HOME\" && make -j{i}\nfi\n",
+    "axl": "(select\n  {{from: trades\n   by: Symbol\n   price: (sum Price)\n   where: (> Date 2025.01.{i})\n"
+           "   take: {i}}})\n(read-csv \"trades.csv\" {{:sep \",\" :header true}})\n",
+}
+
+
+def _per_block_us(fn, blocks) -> float:
+    t0 = time.perf_counter()
+    for block in blocks:
+        fn(*block)
+    return (time.perf_counter() - t0) / len(blocks) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", type=int, default=2000)
+    args = parser.parse_args()
+
+    langs = sorted(SNIPPETS)
+    blocks = [(SNIPPETS[lang].format(i=i), lang) for i in range(args.blocks) for lang in [langs[i % len(langs)]]]
+    print(f"{args.blocks} blocks of ~{sum(len(code) for code, _ in blocks) // len(blocks)} bytes ({', '.join(langs)})")
+
+    results = {}
+    if build_docs.import_pygments() is not None:
+        results["pygments"] = _per_block_us(build_docs.highlight_code, blocks)
+    pygments = build_docs.import_pygments
+    build_docs.import_pygments = lambda: None
+    try:
+        results["builtin"] = _per_block_us(build_docs.highlight_code, blocks)
+    finally:
+        build_docs.import_pygments = pygments
+
+    pages = [(f'<pre><code class="language-{lang}">{build_docs.html.escape(code)}</code></pre>',) for code, lang in blocks]
+    build_docs._highlight_cache = {}
+    for page in pages:
+        build_docs.highlight_code_blocks(*page)
+    results["cached"] = _per_block_us(build_docs.highlight_code_blocks, pages)
+
+    base = next(iter(results.values()))
+    for name, us in results.items():
+        print(f"  {name:<9} {us:>9.1f} µs/block  {base / us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
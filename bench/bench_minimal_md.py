@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Fallback Markdown converter: streaming tokenizer vs the old line-by-line regexes.
+
+Converts one large generated reference page (default ~5 MB) with the old
+minimal_md_to_html() (reproduced below), the current one, and the
+streaming iter_minimal_html() reading from a file, reporting throughput
+and peak extra memory (tracemalloc).
+
+Usage:
+  python bench/bench_minimal_md.py [--mb 5] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+from synthetic import build_docs, synthetic_markdown
+
+
+def legacy_minimal_md_to_html(md: str) -> str:
+    def fenced_repl(match: re.Match) -> str:
+        lang = match.group(1) or ""
+        code = match.group(2)
+        return (
+            f'<pre class="code"><code class="language-{html.escape(lang)}">'
+            f"{html.escape(code)}"
+            f"</code></pre>"
+        )
+
+    html_out = re.sub(r"```\s*([A-Za-z0-9_+-]*)\n([\s\S]*?)\n```", fenced_repl, md)
+    out: List[str] = []
+    in_list = False
+    for raw in html_out.splitlines():
+        line = raw.rstrip()
+        if not line.strip():
+            if in_list:
+                out.append("</ul>")
+                in_list = False
+            continue
+        if line.startswith("### "):
+            out.append(f"<h3>{html.escape(line[4:])}</h3>")
+            continue
+        if line.startswith("## "):
+            out.append(f"<h2>{html.escape(line[3:])}</h2>")
+            continue
+        if line.startswith("# "):
+            out.append(f"<h1>{html.escape(line[2:])}</h1>")
+            continue
+        if re.match(r"^\s*[-*] ", line):
+            if not in_list:
+                out.append("<ul>")
+                in_list = True
+            item = re.sub(r"^\s*[-*] ", "", line)
+            item = re.sub(r"`([^`]+)`", lambda m: f"<code>{html.escape(m.group(1))}</code>", item)
+            out.append(f"<li>{item}</li>")
+            continue
+        paragraph = re.sub(r"`([^`]+)`", lambda m: f"<code>{html.escape(m.group(1))}</code>", line)
+        out.append(f"<p>{paragraph}</p>")
+    if in_list:
+        out.append("</ul>")
+    return "\n".join(out)
+
+
+def measure(fn, repeat: int):
+    """Best-of-`repeat` wall time, then peak traced memory from a separate run."""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = min(elapsed, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=5.0, help="Size of the generated page")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per converter; the best counts")
+    args = parser.parse_args()
+
+    chunks, size, i = [], 0, 0
+    while size < args.mb * 1e6:
+        chunk = synthetic_markdown(i, sections=9)
+        chunks.append(chunk)
+        size += len(chunk) + 2
+        i += 1
+    md = "\n\n".join(chunks)
+    del chunks
+    mb = len(md.encode("utf-8")) / 1e6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "reference.md"
+        src.write_text(md, encoding="utf-8")
+
+        def stream() -> None:
+            with src.open(encoding="utf-8") as f, open(os.devnull, "w", encoding="utf-8") as out:
+                for fragment in build_docs.iter_minimal_html(f):
+                    out.write(fragment + "\n")
+
+        runs = {
+            "legacy (str)": lambda: legacy_minimal_md_to_html(md),
+            "current (str)": lambda: build_docs.minimal_md_to_html(md),
+            "streaming (file)": stream,
+        }
+        print(f"input: {mb:.1f} MB, {md.count(chr(10)) + 1} lines")
+        print(f"{'converter':<18} {'seconds':>8} {'MB/s':>7} {'peak extra MB':>14}")
+        for name, fn in runs.items():
+            elapsed, peak = measure(fn, args.repeat)
+            print(f"{name:<18} {elapsed:>8.2f} {mb / elapsed:>7.1f} {peak / 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Sidebar rendering cost as the docs tree grows.
+
+Compares the per-page pattern (`build_sidebar()`, which builds a fresh nav
+tree for every page) with one shared SidebarRenderer per build.
+
+Usage:
+  python bench/bench_nav.py                 # 100, 1k and 10k pages
+  python bench/bench_nav.py --sizes 500 5000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from synthetic import build_docs, synthetic_pages
+
+
+def _per_page_seconds(fn, pages, sample: int) -> float:
+    step = max(1, len(pages) // sample)
+    chosen = pages[::step][:sample]
+    t0 = time.perf_counter()
+    for page in chosen:
+        fn(page)
+    return (time.perf_counter() - t0) / len(chosen)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--sample", type=int, default=200, help="Pages timed per size (results are extrapolated)")
+    args = parser.parse_args()
+
+    print(f"{'pages':>7} {'setup ms':>9} {'shared µs/page':>15} {'rebuild µs/page':>16} {'speedup':>8} {'sidebar KB':>11}")
+    for size in args.sizes:
+        pages = synthetic_pages(size)
+        t0 = time.perf_counter()
+        renderer = build_docs.SidebarRenderer(build_docs.build_nav_tree(pages))
+        setup = time.perf_counter() - t0
+        shared = _per_page_seconds(lambda p: renderer.render(p.url_path), pages, args.sample)
+        rebuild = _per_page_seconds(lambda p: build_docs.build_sidebar(pages, p), pages, min(args.sample, 20))
+        sidebar_kb = len(renderer.render(pages[0].url_path).encode("utf-8")) / 1024
+        print(f"{len(pages):>7} {setup * 1e3:>9.1f} {shared * 1e6:>15.1f} {rebuild * 1e6:>16.1f} {rebuild / shared:>7.1f}x {sidebar_kb:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Output size and build time of --nav-mode full vs lazy as the docs tree grows.
+
+Each size is built from scratch into a temporary folder in both modes
+(search and precompression off), then one page is added to a deep folder
+and the build repeated, to show how many pages a nav change rewrites.
+
+Usage:
+  python bench/bench_nav_modes.py                # 100, 1k and 3k pages
+  python bench/bench_nav_modes.py --sizes 10000 --jobs 8
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import build_docs, use_tree, write_synthetic_tree
+
+
+def _build(**options) -> tuple:
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        written = build_docs.build_all(search=False, **options)
+    return time.perf_counter() - t0, written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 3000])
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'mode':<5} {'build s':>8} {'HTML MB':>8} {'KB/page':>8} {'nav.json KB':>12} "
+          f"{'+1 page s':>10} {'rewritten':>10}")
+    for size in args.sizes:
+        for mode in build_docs.NAV_MODES:
+            with tempfile.TemporaryDirectory() as tmp:
+                root = Path(tmp)
+                pages = write_synthetic_tree(root, size)
+                use_tree(root)
+                seconds, _ = _build(force=True, jobs=args.jobs, nav_mode=mode)
+                html_bytes = sum(p.stat().st_size for p in build_docs.DOCS_OUT_DIR.rglob("*.html"))
+                nav_json = build_docs.NAV_JSON_PATH
+                nav_kb = nav_json.stat().st_size / 1024 if nav_json.exists() else 0.0
+                deepest = max(pages, key=lambda p: len(p.parts))
+                (deepest.parent / "zz-added.md").write_text("# Added\n\nOne more page.\n", encoding="utf-8")
+                added, written = _build(jobs=args.jobs, nav_mode=mode)
+                rewritten = sum(1 for p in written if p.suffix == ".html")
+                print(f"{size:>6} {mode:<5} {seconds:>8.2f} {html_bytes / 2**20:>8.1f} {html_bytes / size / 1024:>8.1f} "
+                      f"{nav_kb:>12.1f} {added:>10.2f} {rewritten:>10}")
+
+
+if __name__ == "__main__":
+    main()
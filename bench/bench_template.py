@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Page assembly throughput: precompiled template vs chained str.replace.
+
+"replace" reproduces the old render_template(): five .replace() calls
+over the whole template, then a "../" rewrite over the whole page for
+nested pages. "compiled" is the current render_template().
+
+Usage:
+  python bench/bench_template.py [--pages 1000] [--nav-pages 300]
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import time
+
+from synthetic import build_docs, synthetic_markdown, synthetic_pages
+
+
+LEGACY_TEMPLATE = build_docs.PAGE_TEMPLATE.replace("__BASE__", "..")
+
+
+def legacy_render(styles: str, sidebar_html: str, content_html: str, page_title: str, base_prefix: str) -> str:
+    result = (
+        LEGACY_TEMPLATE
+        .replace("__STYLES__", styles)
+        .replace("__SIDEBAR__", sidebar_html)
+        .replace("__CONTENT__", content_html)
+        .replace("__TITLE__", html.escape(page_title))
+    )
+    if base_prefix != "..":
+        result = result.replace("../", f"{base_prefix}/")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000, help="Pages rendered per measurement")
+    parser.add_argument("--nav-pages", type=int, default=300, help="Size of the docs tree shown in the sidebar")
+    args = parser.parse_args()
+
+    styles = build_docs.inline_styles(build_docs.read_site_css())
+    pages = synthetic_pages(args.nav_pages)
+    sidebar = build_docs.SidebarRenderer(build_docs.build_nav_tree(pages)).render(pages[0].url_path)
+    content = build_docs.convert_markdown(synthetic_markdown(0))
+    print(f"sidebar {len(sidebar) / 1024:.0f} KB, content {len(content) / 1024:.1f} KB, styles {len(styles) / 1024:.1f} KB")
+    print(f"{'page depth':<12} {'replace pages/s':>16} {'compiled pages/s':>17} {'speedup':>8}")
+    for label, prefix in (("docs/", ".."), ("docs/a/b/", "../../..")):
+        rates = []
+        for fn in (legacy_render, build_docs.render_template):
+            t0 = time.perf_counter()
+            for i in range(args.pages):
+                fn(styles, sidebar, content, f"Page {i}", prefix)
+            rates.append(args.pages / (time.perf_counter() - t0))
+        print(f"{label:<12} {rates[0]:>16.0f} {rates[1]:>17.0f} {rates[1] / rates[0]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
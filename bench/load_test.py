@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Load generator for server.py: requests/sec and latency percentiles.
+
+Starts server.py on a free port (unless --url is given), then keeps
+--concurrency keep-alive connections busy for --duration seconds, cycling
+through the paths a docs page view fetches.
+
+Usage:
+  python bench/load_test.py                   # default server
+  python bench/load_test.py --compare         # without vs with --cache-mb 64
+  python bench/load_test.py --server-args "--cache-mb 64" --concurrency 32
+  python bench/load_test.py --url http://localhost:8000
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_PATHS = [
+    "/docs/",
+    "/docs/getting-started.html",
+    "/axl-logo.svg",
+    "/vendor/fontawesome/css/all.min.css",
+    "/vendor/fontawesome/webfonts/fa-solid-900.woff2",
+    "/vendor/fontawesome/webfonts/fa-brands-400.woff2",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(extra_args: List[str], threads: int) -> "tuple[subprocess.Popen, str]":
+    port = free_port()
+    cmd = [sys.executable, str(ROOT_DIR / "server.py"), "--port", str(port), "--bind", "127.0.0.1",
+           "--threads", str(threads), "--no-open", *extra_args]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("server.py did not start")
+
+
+def run_load(base_url: str, paths: List[str], concurrency: int, duration: float,
+             headers: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    url = urllib.parse.urlsplit(base_url)
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    sent = [0] * concurrency
+    deadline = time.monotonic() + duration
+
+    def worker(n: int) -> None:
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=10)
+        i = n
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", path, headers=headers or {})
+                resp = conn.getresponse()
+                body = resp.read()
+                if resp.status >= 400:
+                    errors[n] += 1
+                sent[n] += len(body)
+            except (OSError, http.client.HTTPException):
+                errors[n] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(url.hostname, url.port, timeout=10)
+                continue
+            latencies[n].append(time.perf_counter() - t0)
+        conn.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    all_lat = sorted(x for per in latencies for x in per)
+    if not all_lat:
+        raise RuntimeError("no successful requests")
+
+    def pct(p: float) -> float:
+        return all_lat[min(len(all_lat) - 1, int(p / 100 * len(all_lat)))] * 1e3
+
+    return {
+        "requests": len(all_lat),
+        "errors": sum(errors),
+        "rps": len(all_lat) / elapsed,
+        "mb_per_s": sum(sent) / elapsed / 1e6,
+        "p50_ms": pct(50),
+        "p99_ms": pct(99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Load an already running server instead of starting one")
+    parser.add_argument("--server-args", default="", help="Extra server.py arguments, e.g. '--cache-mb 64'")
+    parser.add_argument("--compare", action="store_true", help="Run without and with --cache-mb 64")
+    parser.add_argument("--threads", type=int, default=16, help="server.py --threads")
+    parser.add_argument("--concurrency", "-c", type=int, default=8)
+    parser.add_argument("--duration", "-d", type=float, default=5.0)
+    parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+
+    runs = {}
+    if args.url:
+        runs[args.url] = run_load(args.url, paths, args.concurrency, args.duration)
+    else:
+        variants = [args.server_args]
+        if args.compare:
+            variants = ["", "--cache-mb 64"]
+        for extra in variants:
+            proc, base = start_server(shlex.split(extra), args.threads)
+            try:
+                runs[extra or "default"] = run_load(base, paths, args.concurrency, args.duration)
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return
+    print(f"{'mode':<16} {'req/s':>9} {'MB/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode, r in runs.items():
+        print(f"{mode:<16} {r['rps']:>9.0f} {r['mb_per_s']:>8.1f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
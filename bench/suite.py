@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Benchmark suite: build phases and server throughput on a synthetic docs tree.
+
+Writes a tree (see synthetic.py) to a temporary folder, then measures:
+
+  discover        discover_docs() over the whole tree, without a manifest
+  nav             build_nav_tree() + SidebarRenderer, render() per page,
+                  and the per-page build_sidebar() on a sample
+  convert         convert_markdown() per page, with the markdown package
+                  (if installed) and with the fallback converter
+  template        render_template() per page
+  build           build_all(): from scratch (with its phase profile), with
+                  nothing changed, and after editing one page
+  serve           load_test.run_load() against server.py serving the result
+
+Micro timings are the best of --repeat runs. Results are one flat
+{metric: number} map, printed as a table and written with --json so runs
+on different commits can be compared with --compare.
+
+Usage:
+  python bench/suite.py                                    # 1000 pages
+  python bench/suite.py --pages 5000 --depth 4 --code-every 1 --json after.json
+  python bench/suite.py --compare before.json after.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from synthetic import ROOT_DIR, build_docs, use_tree, write_synthetic_tree
+import load_test
+
+# Metrics where bigger is better; --compare flags the rest when they grow
+HIGHER_IS_BETTER = ("serve.rps", "serve.mb_per_s")
+
+
+def _best(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _quiet(fn: Callable[[], object]) -> object:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn()
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_build(args: argparse.Namespace, root: Path) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    paths = write_synthetic_tree(root, args.pages, args.fanout, args.depth, args.sections, args.code_every)
+    use_tree(root)
+    results["tree.pages"] = len(paths)
+    results["tree.md_kb"] = sum(p.stat().st_size for p in paths) / 1024
+
+    results["discover.s"] = _best(lambda: build_docs.discover_docs(), args.repeat)
+    pages = build_docs.discover_docs()
+    n = len(pages)
+    sample = pages[::max(1, n // 200)]
+
+    results["nav.tree_s"] = _best(lambda: build_docs.SidebarRenderer(build_docs.build_nav_tree(pages)), args.repeat)
+    sidebars = build_docs.SidebarRenderer(build_docs.build_nav_tree(pages))
+    results["nav.render_us"] = _best(lambda: [sidebars.render(p.url_path) for p in sample], args.repeat) / len(sample) * 1e6
+    few = sample[:10]
+    results["nav.rebuild_us"] = _best(lambda: [build_docs.build_sidebar(pages, p) for p in few], 1) / len(few) * 1e6
+
+    texts = [p.text or p.source_path.read_text(encoding="utf-8") for p in pages]
+    if build_docs.import_markdown() is not None:
+        results["convert.markdown_us"] = _best(lambda: [build_docs.convert_markdown(t) for t in texts], args.repeat) / n * 1e6
+    md_converter = build_docs.markdown_converter
+    build_docs.markdown_converter = lambda: None
+    try:
+        results["convert.fallback_us"] = _best(lambda: [build_docs.convert_markdown(t) for t in texts], args.repeat) / n * 1e6
+    finally:
+        build_docs.markdown_converter = md_converter
+
+    styles = build_docs.inline_styles(build_docs.read_site_css())
+    content = build_docs.convert_markdown(texts[0])
+    sidebar = sidebars.render(sample[0].url_path)
+    results["template.us"] = _best(lambda: [build_docs.render_template(styles, sidebar, content, p.title, build_docs._base_prefix(p))
+                                            for p in sample], args.repeat) / len(sample) * 1e6
+
+    build_options = dict(jobs=args.jobs, nav_mode=args.nav_mode)
+    build_docs._convert_cache.clear()
+    profile = build_docs.BuildProfile()
+    t0 = time.perf_counter()
+    _quiet(lambda: build_docs.build_all(force=True, profile=profile, **build_options))
+    results["build.cold_s"] = time.perf_counter() - t0
+    for name, t in profile.report(0)["phases"].items():
+        results[f"build.cold.{name}_s"] = t["wall"]
+    results["build.html_mb"] = sum(p.stat().st_size for p in build_docs.DOCS_OUT_DIR.rglob("*.html")) / 2**20
+    results["build.warm_s"] = _best(lambda: _quiet(lambda: build_docs.build_all(**build_options)), args.repeat)
+    touched = paths[len(paths) // 2]
+    touched.write_text(touched.read_text(encoding="utf-8") + "\nOne more line.\n", encoding="utf-8")
+    t0 = time.perf_counter()
+    _quiet(lambda: build_docs.build_all(**build_options))
+    results["build.touch_s"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    _quiet(build_docs.precompress)
+    results["build.precompress_s"] = time.perf_counter() - t0
+    return results
+
+
+def bench_serve(args: argparse.Namespace, root: Path) -> Dict[str, float]:
+    site = root / "site"
+    docs = sorted(site.joinpath("docs").rglob("*.html"))
+    assets = sorted(p for p in site.joinpath("docs", "assets").rglob("*") if p.is_file() and p.suffix not in (".gz", ".br"))
+    paths = ["/" + p.relative_to(site).as_posix() for p in docs[::max(1, len(docs) // 20)] + assets]
+    proc, base = load_test.start_server(["--directory", str(site), "--no-access-log"], args.threads)
+    try:
+        run = load_test.run_load(base, paths, args.concurrency, args.duration,
+                                 headers={"Accept-Encoding": "br, gzip"})
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {f"serve.{key}": value for key, value in run.items()}
+
+
+def print_results(results: Dict[str, float]) -> None:
+    for name, value in results.items():
+        print(f"  {name:<28} {value:>12.3f}")
+
+
+def compare(before_path: Path, after_path: Path) -> None:
+    before = json.loads(before_path.read_text(encoding="utf-8"))
+    after = json.loads(after_path.read_text(encoding="utf-8"))
+    print(f"{'metric':<28} {before['meta']['commit']:>12} {after['meta']['commit']:>12} {'ratio':>8}")
+    for name, new in after["results"].items():
+        old = before["results"].get(name)
+        if old is None:
+            continue
+        ratio = new / old if old else float("inf")
+        worse = ratio < 0.9 if name in HIGHER_IS_BETTER else ratio > 1.1
+        flag = "  <-- worse" if worse and not name.startswith("tree.") else ""
+        print(f"{name:<28} {old:>12.3f} {new:>12.3f} {ratio:>7.2f}x{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3, help="Folder levels below docs/")
+    parser.add_argument("--fanout", type=int, default=10, help="Folders per level")
+    parser.add_argument("--sections", type=int, default=6, help="Sections per page (page size)")
+    parser.add_argument("--code-every", type=int, default=2, help="A code block every N sections (0: none)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="build_all() worker processes")
+    parser.add_argument("--nav-mode", choices=build_docs.NAV_MODES, default="full")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per micro timing; the best counts")
+    parser.add_argument("--serve", action=argparse.BooleanOptionalAction, default=True,
+                        help="Load-test server.py on the built tree (default: yes)")
+    parser.add_argument("--threads", type=int, default=16, help="server.py --threads")
+    parser.add_argument("--concurrency", "-c", type=int, default=8)
+    parser.add_argument("--duration", "-d", type=float, default=3.0, help="Seconds of load")
+    parser.add_argument("--keep", type=Path, metavar="DIR", help="Build in DIR (kept) instead of a temporary folder")
+    parser.add_argument("--json", type=Path, metavar="PATH", help="Write the results as JSON")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="Compare two --json files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    meta = {
+        "commit": _git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "renderer": build_docs.renderer_id(),
+        "highlighter": build_docs.highlighter_id(),
+        "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()
+                 if k not in ("json", "compare", "keep")},
+    }
+    print(f"{args.pages} pages, depth {args.depth}, {args.sections} sections/page, code every {args.code_every}; "
+          f"{meta['renderer']}, {meta['highlighter']}, commit {meta['commit']}")
+    with contextlib.ExitStack() as stack:
+        if args.keep:
+            root = args.keep
+            root.mkdir(parents=True, exist_ok=True)
+        else:
+            root = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="axl-bench-")))
+        results = bench_build(args, root)
+        if args.serve:
+            results.update(bench_serve(args, root))
+    print_results(results)
+    if args.json:
+        args.json.write_text(json.dumps({"meta": meta, "results": results}, indent=1) + "\n", encoding="utf-8")
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
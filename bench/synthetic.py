@@ -0,0 +1,147 @@
+"""Synthetic doc trees for the benchmarks in this folder.
+
+Also usable on its own, to write a tree to disk:
+  python bench/synthetic.py /tmp/axl-docs --pages 5000 --depth 4 --sections 12 --code-every 1
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import build_docs  # noqa: E402
+
+# Files of the main site that every docs page links to
+SITE_ROOT_FILES = ("index.html", "axl-logo.svg")
+
+
+def synthetic_rel_paths(count: int, fanout: int = 10, depth: int = 3) -> List[Path]:
+    """Relative `.md` paths spread over a tree of `fanout` folders per level.
+
+    Every folder gets an `index.md`, like a real docs section would.
+    """
+    paths = set()
+    for i in range(count):
+        parts = []
+        n = i
+        for _ in range(depth):
+            parts.append(f"section-{n % fanout}")
+            n //= fanout
+        level = i % (depth + 1)
+        folder = Path(*parts[:level]) if level else Path()
+        path = folder / "index.md"
+        if i % fanout or path in paths:
+            path = folder / f"page-{i}.md"
+        paths.add(path)
+    return sorted(paths)
+
+
+def synthetic_pages(count: int, fanout: int = 10, depth: int = 3) -> List[build_docs.DocPage]:
+    """In-memory DocPage list; nothing is written to disk."""
+    pages = []
+    for rel in synthetic_rel_paths(count, fanout, depth):
+        out_rel = rel.with_suffix(".html")
+        pages.append(build_docs.DocPage(
+            build_docs.DOCS_SRC_DIR / rel,
+            build_docs.DOCS_OUT_DIR / out_rel,
+            "/docs/" + out_rel.as_posix(),
+            rel.stem.replace("-", " ").title(),
+        ))
+    return pages
+
+
+def synthetic_markdown(index: int, sections: int = 6, code_every: int = 2, link: Optional[str] = None) -> str:
+    """A page resembling the API reference: headings, prose, lists, tables and code.
+
+    Every `code_every`-th section has a code block (0: none) and links to
+    `link`, the next page's relative URL; without one (pages that are only
+    converted, never written as a tree), the link target is made up.
+    """
+    link = link or f"./page-{index + 1}.html"
+    out = [f"# Function {index}", "", f"Reference for `axl_fn_{index}()` and friends.", ""]
+    for s in range(sections):
+        out += [f"## Section {s}", "",
+                f"Calls [axl_fn_{index + 1}]({link}) with `x` and returns a vector.", "",
+                "- takes `x` as input", "- returns `y`", "- see **notes** below", ""]
+        if code_every and s % code_every == 0:
+            out += ["```c", f"axl_t r = axl_fn_{index}(x, {s});", "if (!r) return -1;", "```", ""]
+        if s % 3 == 2:
+            out += ["| arg | type | meaning |", "|-----|------|---------|",
+                    "| x | vector | input |", "| n | int | count |", ""]
+    return "\n".join(out)
+
+
+def write_synthetic_tree(root: Path, count: int, fanout: int = 10, depth: int = 3,
+                         sections: int = 6, code_every: int = 2) -> List[Path]:
+    """Write `count` synthetic Markdown pages under `root`/docs; returns their paths.
+
+    `sections` sets the page size and `code_every` the code-block density,
+    as in synthetic_markdown(). Each page links to the next one, and the
+    main site's SITE_ROOT_FILES are copied to `root`/site, so every link
+    in the tree resolves.
+    """
+    (root / "site").mkdir(parents=True, exist_ok=True)
+    for name in SITE_ROOT_FILES:
+        shutil.copy2(ROOT_DIR / "site" / name, root / "site" / name)
+    written = []
+    rels = synthetic_rel_paths(count, fanout, depth)
+    for i, rel in enumerate(rels):
+        path = root / "docs" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        target = rels[(i + 1) % len(rels)].with_suffix(".html")
+        link = Path(os.path.relpath(target, rel.parent)).as_posix()
+        path.write_text(synthetic_markdown(i, sections, code_every, link), encoding="utf-8")
+        written.append(path)
+    return written
+
+
+def use_tree(root: Path) -> None:
+    """Point build_docs at `root`/docs and `root`/site instead of the repo's folders.
+
+    Everything build_docs keeps under site/docs/ and .build-cache/ moves
+    along; site/index.html (for the CSS) and the vendored Font Awesome are
+    still read from the repo.
+    """
+    moves = {build_docs.DOCS_OUT_DIR: root / "site" / "docs", build_docs.BUILD_CACHE_DIR: root / ".build-cache"}
+
+    def moved(path: Path) -> Path:
+        for old, new in moves.items():
+            if path == old or old in path.parents:
+                return new / path.relative_to(old)
+        return path
+
+    for name, value in list(vars(build_docs).items()):
+        if isinstance(value, Path):
+            setattr(build_docs, name, moved(value))
+        elif isinstance(value, tuple) and value and all(isinstance(v, Path) for v in value):
+            setattr(build_docs, name, tuple(moved(v) for v in value))
+    build_docs.SITE_DIR = root / "site"
+    build_docs.DOCS_SRC_DIR = root / "docs"
+    build_docs.LIVE_RELOAD_FILE = root / "site" / ".livereload.json"
+    build_docs._convert_cache.clear()
+    build_docs._highlight_cache = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic docs/ tree")
+    parser.add_argument("root", type=Path, help="Folder to write docs/ into")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3, help="Folder levels below docs/")
+    parser.add_argument("--fanout", type=int, default=10, help="Folders per level")
+    parser.add_argument("--sections", type=int, default=6, help="Sections per page (page size)")
+    parser.add_argument("--code-every", type=int, default=2, help="A code block every N sections (0: none)")
+    args = parser.parse_args()
+    paths = write_synthetic_tree(args.root, args.pages, args.fanout, args.depth, args.sections, args.code_every)
+    size = sum(p.stat().st_size for p in paths)
+    print(f"Wrote {len(paths)} page(s), {size / 1024:.0f} KB, to {args.root / 'docs'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,36 @@ Features:
 - Auto-builds a sidebar navigation from the docs tree
 - Supports fenced code blocks, tables, and basic Markdown.
 - Works with or without `markdown` package (falls back to a small converter)
+- Incremental: a build manifest records what each page was built from, so
+  unchanged pages are skipped and sidebar-only changes are patched in place
+- Writes precompressed `.gz` (and `.br`, if the `brotli` module is present)
+  siblings of text assets for server.py to serve
+- Highlights fenced code at build time (Pygments if installed, else
+  built-in lexers for c/bash/axl), with highlight.js's class names
+- Self-hosts the highlight.js theme, JetBrains Mono (from a local cache,
+  see --fetch-vendor) and a Font Awesome subset under content-hashed names
+- Writes a sharded full-text search index to `site/docs/search/`, queried
+  in the browser by the search box on every page
+- Checks every internal link and #anchor against the pages just built, and
+  writes `site/docs/asset-manifest.json` (and, with --site-url, `sitemap.xml`)
 
 Usage:
   python build_docs.py            # builds once
-  python build_docs.py --watch    # optional: rebuild on changes (polling)
+  python build_docs.py --watch    # optional: rebuild on changes (inotify, else polling);
+                                  # open pages served by server.py reload themselves
+  python build_docs.py --force    # ignore the build manifest, rebuild every page
+  python build_docs.py --jobs 4   # render pages on 4 processes (default: CPU count)
+  python build_docs.py --no-compress  # skip writing .gz/.br siblings
+  python build_docs.py --css external # link one hashed stylesheet instead of inlining CSS
+  python build_docs.py --no-search    # skip (and remove) the search index
+  python build_docs.py --nav-mode lazy  # per-page sidebar holds only the page's path (huge trees)
+  python build_docs.py --fetch-vendor # cache the highlight.js theme + JetBrains Mono, then build
+  python build_docs.py --site-url https://example.org --strict-links  # sitemap; fail on broken links
+  python build_docs.py --force --profile --profile-json build-profile.json  # where build time goes
 
 Dependencies (optional, recommended):
-  pip install markdown
+  pip install markdown pygments
+  pip install fonttools brotli   # glyph-subset the Font Awesome webfonts
 
 The output is served by the existing dev server (server.py) at:
   http://localhost:8000/docs/
@@ -25,14 +48,29 @@ The output is served by the existing dev server (server.py) at:
 from __future__ import annotations
 
 import argparse
+import cProfile
+import ctypes
+import ctypes.util
+import functools
+import gzip
+import hashlib
 import html
+import io
+import json
 import os
 import re
+import select
+import struct
 import sys
 import time
+import unicodedata
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 
 ROOT_DIR = Path(__file__).resolve().parent
@@ -40,6 +78,17 @@ SITE_DIR = ROOT_DIR / "site"
 DOCS_SRC_DIR = ROOT_DIR / "docs"
 DOCS_OUT_DIR = SITE_DIR / "docs"
 INDEX_HTML = SITE_DIR / "index.html"
+# Build state kept between builds, outside site/ so it is never published
+BUILD_CACHE_DIR = ROOT_DIR / ".build-cache"
+MANIFEST_PATH = BUILD_CACHE_DIR / "build-manifest.json"
+# Where earlier versions kept that state; build_all() removes them
+LEGACY_CACHE_FILES = (DOCS_OUT_DIR / ".build-manifest.json", DOCS_OUT_DIR / ".search-cache.json",
+                      DOCS_OUT_DIR / ".highlight-cache.json")
+
+# Bump whenever render_template() output changes, so the manifest
+# invalidates every previously built page.
+TEMPLATE_VERSION = "7"
+MANIFEST_VERSION = 2
 
 
 def read_site_css() -> str:
@@ -53,7 +102,9 @@ def read_site_css() -> str:
     return m.group(1).strip()
 
 
+@functools.lru_cache(maxsize=None)
 def import_markdown() -> Optional[object]:
+    # Cached: a failing import re-searches sys.path on every call.
     try:
         import markdown  # type: ignore
         return markdown
@@ -61,80 +112,575 @@ def import_markdown() -> Optional[object]:
         return None
 
 
+# Bump when the fallback converter's output changes; part of renderer_id().
+MINIMAL_RENDERER_VERSION = 3
+
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([A-Za-z0-9_+-]*)")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_LIST_ITEM_RE = re.compile(r"^\s*(?:([-*+])|\d+[.)])\s+(.*)$")
+_TABLE_SEP_CELL_RE = re.compile(r"^\s*(:?)-+(:?)\s*$")
+_TABLE_CELL_SPLIT_RE = re.compile(r"(?<!\\)\|")
+_INLINE_RE = re.compile(r"`([^`]+)`|\[([^\]]+)\]\(\s*([^)\s]+)(?:\s+\"([^\"]*)\")?\s*\)")
+_TAG_RE = re.compile(r"<[^>]+>")
+_SLUG_STRIP_RE = re.compile(r"[^\w\s-]")
+_SLUG_SEP_RE = re.compile(r"[-\s]+")
+_HTML_SPECIAL_RE = re.compile(r"[&<>\"']")
+
+
+def _escape(text: str) -> str:
+    # Most text has nothing to escape, and the search is cheaper than escape()
+    return html.escape(text) if _HTML_SPECIAL_RE.search(text) else text
+
+
+def _code_span(text: str) -> str:
+    return f"<code>{_escape(text)}</code>"
+
+
+def _inline_repl(m: re.Match) -> str:
+    code, label, href, title = m.groups()
+    if code is not None:
+        return _code_span(code)
+    title = f' title="{_escape(title)}"' if title else ""
+    return f'<a href="{_escape(href)}"{title}>{render_inline(label)}</a>'
+
+
+def render_inline(text: str) -> str:
+    """Inline Markdown: `code` spans and [links](url "title"); other text passes through."""
+    if "`" not in text and "[" not in text:
+        return text
+    return _INLINE_RE.sub(_inline_repl, text)
+
+
+def render_inline_escaped(text: str) -> str:
+    """render_inline(), with the text between code spans and links HTML-escaped."""
+    if "`" not in text and "[" not in text:
+        return _escape(text)
+    out: List[str] = []
+    pos = 0
+    for m in _INLINE_RE.finditer(text):
+        out.append(_escape(text[pos:m.start()]))
+        out.append(_inline_repl(m))
+        pos = m.end()
+    out.append(_escape(text[pos:]))
+    return "".join(out)
+
+
+def slugify(text: str) -> str:
+    """Heading id, compatible with the slugs of markdown's toc extension."""
+    if "<" in text or "&" in text:
+        text = html.unescape(_TAG_RE.sub("", text))
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return _SLUG_SEP_RE.sub("-", _SLUG_STRIP_RE.sub("", text).strip().lower())
+
+
+def _table_cells(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    if "\\" not in line:
+        return [cell.strip() for cell in line.split("|")]
+    return [cell.strip().replace("\\|", "|") for cell in _TABLE_CELL_SPLIT_RE.split(line)]
+
+
+def _table_aligns(line: str, columns: int) -> Optional[List[str]]:
+    """Column alignments if `line` is a table delimiter row for `columns` columns."""
+    if "-" not in line:
+        return None
+    aligns: List[str] = []
+    for cell in _table_cells(line):
+        m = _TABLE_SEP_CELL_RE.match(cell)
+        if m is None:
+            return None
+        left, right = m.group(1), m.group(2)
+        aligns.append("center" if left and right else "right" if right else "left" if left else "")
+    return aligns if len(aligns) == columns else None
+
+
+def _heading_id(text: str, used_ids: Dict[str, int]) -> str:
+    slug = slugify(text) or "section"
+    n = used_ids.get(slug)
+    used_ids[slug] = 0 if n is None else n + 1
+    return slug if n is None else f"{slug}_{n + 1}"
+
+
+def _table_tags(aligns: List[str], cell_tag: str) -> List[Tuple[str, str]]:
+    """Opening and closing tags for the cells of a table row."""
+    return [(f'<{cell_tag} style="text-align: {align};">' if align else f"<{cell_tag}>", f"</{cell_tag}>")
+            for align in aligns]
+
+
+def _table_row(line: str, tags: List[Tuple[str, str]]) -> str:
+    cells = _table_cells(line)
+    row = ["<tr>"]
+    for i, (start, end) in enumerate(tags):
+        row.append(start + (render_inline(cells[i]) if i < len(cells) else "") + end)
+    row.append("</tr>")
+    return "\n".join(row)
+
+
+def _close_block(block: str, held: List[str], opening: str) -> str:
+    if block == "p":
+        return "<p>" + "\n".join(held) + "</p>"
+    if block == "code":
+        return opening + html.escape("\n".join(held), False) + "</code></pre>"
+    closing = "</tbody>\n</table>" if block == "table" else f"</{block}>"
+    return "\n".join([opening, *held, closing])
+
+
+def iter_minimal_html(lines: Iterable[str]) -> Iterator[str]:
+    """Stream HTML for Markdown `lines` in one pass, one fragment per block or less.
+
+    A single block state machine: only the open block (paragraph, code,
+    list or table) is held back, and written out in one piece when it
+    closes, so apart from the heading ids seen so far memory grows with
+    the largest block, not the document. `lines` may be any iterable, such as an open file:
+
+        with src.open(encoding="utf-8") as f, dst.open("w", encoding="utf-8") as out:
+            for fragment in iter_minimal_html(f):
+                out.write(fragment + "\n")
+    """
+    fence_match = _FENCE_RE.match
+    heading_match = _HEADING_RE.match
+    list_match = _LIST_ITEM_RE.match
+    inline_sub = _INLINE_RE.sub
+    used_ids: Dict[str, int] = {}
+    block: Optional[str] = None  # "p", "ul", "ol", "table", "code" or None
+    held: List[str] = []         # the open block's lines: raw for code, else rendered
+    opening = ""                 # the open block's opening tags (unused for "p")
+    fence = ""
+    row_tags: List[Tuple[str, str]] = []  # the open table's <td> tags
+    table_head: Optional[str] = None  # a line that may turn out to be a table header
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+
+        if block == "code":
+            if fence in line:
+                stripped = line.strip()
+                if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                    yield _close_block(block, held, opening)
+                    block, held = None, []
+                    continue
+            held.append(line)
+            continue
+
+        if table_head is not None:
+            head, table_head = table_head, None
+            head_aligns = _table_aligns(line, len(_table_cells(head)))
+            if head_aligns is not None:
+                if block is not None:
+                    yield _close_block(block, held, opening)
+                block, held, row_tags = "table", [], _table_tags(head_aligns, "td")
+                opening = ("<table>\n<thead>\n" + _table_row(head, _table_tags(head_aligns, "th"))
+                           + "\n</thead>\n<tbody>")
+                continue
+            if block != "p":
+                if block is not None:
+                    yield _close_block(block, held, opening)
+                block, held = "p", []
+            held.append(render_inline(head.strip()))
+
+        stripped = line.lstrip()
+        if not stripped:
+            if block is not None:
+                yield _close_block(block, held, opening)
+                block, held = None, []
+            continue
+
+        if block == "table":
+            if "|" in line:
+                held.append(_table_row(line, row_tags))
+                continue
+            yield _close_block(block, held, opening)
+            block = None
+
+        # Dispatch on the first character so plain text skips the block regexes.
+        first = stripped[0]
+        if first == "`" or first == "~":
+            m = fence_match(line)
+            if m:
+                if block is not None:
+                    yield _close_block(block, held, opening)
+                block, held, fence = "code", [], m.group(1)
+                opening = f'<pre class="code"><code class="language-{html.escape(m.group(2))}">'
+                continue
+        elif first == "#":
+            m = heading_match(line)
+            if m:
+                if block is not None:
+                    yield _close_block(block, held, opening)
+                    block, held = None, []
+                level = len(m.group(1))
+                text = render_inline_escaped(m.group(2))
+                yield f'<h{level} id="{_heading_id(text, used_ids)}">{text}</h{level}>'
+                continue
+        elif first in "-*+" or first.isdigit():
+            m = list_match(line)
+            if m:
+                tag = "ul" if m.group(1) else "ol"
+                if block != tag:
+                    if block is not None:
+                        yield _close_block(block, held, opening)
+                    block, held, opening = tag, [], f"<{tag}>"
+                held.append(f"<li>{render_inline(m.group(2))}</li>")
+                continue
+
+        if block != "p":
+            if "|" in line:
+                table_head = line
+                continue
+            if block is not None:
+                yield _close_block(block, held, opening)
+            block, held = "p", []
+        # Plain text (no code spans or links) is added as is
+        text = stripped.rstrip()
+        held.append(inline_sub(_inline_repl, text) if "`" in text or "[" in text else text)
+
+    if table_head is not None:
+        if block != "p":
+            if block is not None:
+                yield _close_block(block, held, opening)
+            block, held = "p", []
+        held.append(render_inline(table_head.strip()))
+    if block is not None:
+        yield _close_block(block, held, opening)
+
+
 def minimal_md_to_html(md: str) -> str:
     """A tiny Markdown-to-HTML fallback renderer.
 
     Supports:
-    - #, ##, ### headings
-    - ```lang fenced code```
-    - paragraphs and inline code `code`
-    - unordered lists (- or *)
+    - # to ###### headings (with toc-style ids)
+    - ```lang (or ~~~) fenced code
+    - paragraphs, inline code `code` and [links](url "title")
+    - unordered (-, *, +) and ordered (1.) lists
+    - pipe tables with alignment
     This is intentionally small but good enough if the markdown module
-    is unavailable.
+    is unavailable. The build has each page in memory anyway (it hashes
+    and templates it whole), so it uses this form; iter_minimal_html()
+    streams, for converting a large file without reading it all.
     """
+    return "\n".join(iter_minimal_html(md.splitlines()))
+
+
+# --- Syntax highlighting -------------------------------------------------
+#
+# Fenced code is highlighted at build time into the same hljs-* spans
+# highlight.js used to add in the browser, so the theme CSS still applies
+# and pages need no script. Pygments lexes the languages it knows; c, bash
+# and axl fall back to the small regex lexers below. Highlighted blocks are
+# cached on disk by a hash of their language and code.
+
+# Bump when highlighting output changes; part of highlighter_id().
+HIGHLIGHT_VERSION = 2
+HIGHLIGHT_CACHE_PATH = BUILD_CACHE_DIR / "highlight-cache.json"
+HIGHLIGHT_CACHE_SIZE = 20000
+
+_CODE_BLOCK_RE = re.compile(r'<pre([^>]*)><code(?: class="([^"]*)")?>(.*?)</code></pre>', re.S)
+_LANGUAGE_CLASS_RE = re.compile(r"\blanguage-([\w+-]+)")
+
+
+@functools.lru_cache(maxsize=None)
+def import_pygments() -> Optional[object]:
+    try:
+        import pygments.lexers  # type: ignore
+        import pygments.token  # type: ignore
+        import pygments.util  # type: ignore
+        return pygments
+    except Exception:
+        return None
+
+
+def highlighter_id() -> str:
+    """Identify the highlighter in use; part of every page's build key."""
+    pygments = import_pygments()
+    engine = "builtin" if pygments is None else "pygments-" + str(getattr(pygments, "__version__", "unknown"))
+    return f"{engine}-{HIGHLIGHT_VERSION}"
+
+
+def _regex_lexer(rules: List[Tuple[str, str]]) -> Tuple["re.Pattern[str]", List[str]]:
+    """One alternation of (hljs class, pattern) rules; the first matching rule wins."""
+    pattern = "|".join(f"(?P<g{i}>{regex})" for i, (_, regex) in enumerate(rules))
+    return re.compile(pattern, re.M), [cls for cls, _ in rules]
+
+
+def _words(*words: str) -> str:
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+
+_C_STRING = r"\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'"
+
+BUILTIN_LEXERS: Dict[str, Tuple["re.Pattern[str]", List[str]]] = {
+    "c": _regex_lexer([
+        ("comment", r"//[^\n]*|/\*[\s\S]*?\*/"),
+        ("meta", r"^[ \t]*#[ \t]*\w+(?:[ \t]*<[^>\n]*>)?"),
+        ("string", _C_STRING),
+        ("number", r"\b(?:0[xX][0-9a-fA-F]+|\d+\.?\d*(?:[eE][+-]?\d+)?)[uUlLfF]*\b"),
+        ("type", _words("void", "char", "short", "int", "long", "float", "double", "signed", "unsigned",
+                        "bool", "_Bool", "size_t", "ssize_t", "ptrdiff_t", "intptr_t", "uintptr_t",
+                        r"u?int(?:8|16|32|64)_t", "FILE")),
+        ("keyword", _words("auto", "break", "case", "const", "continue", "default", "do", "else", "enum",
+                           "extern", "for", "goto", "if", "inline", "register", "restrict", "return",
+                           "sizeof", "static", "struct", "switch", "typedef", "union", "volatile", "while")),
+        ("literal", _words("NULL", "true", "false")),
+        ("title function_", r"\b[A-Za-z_]\w*(?=\s*\()"),
+    ]),
+    "bash": _regex_lexer([
+        ("comment", r"(?:^|(?<=\s))#[^\n]*"),
+        ("string", r"\"(?:\\.|[^\"\\])*\"|'[^']*'"),
+        ("variable", r"\$\{[^}\n]*\}|\$(?:\w+|[@*#?$!0-9-])"),
+        ("keyword", _words("if", "then", "else", "elif", "fi", "for", "in", "do", "done", "case", "esac",
+                           "while", "until", "function", "select", "return", "time")),
+        ("built_in", _words("echo", "printf", "cd", "pwd", "export", "unset", "local", "read", "set",
+                            "source", "alias", "exit", "eval", "exec", "shift", "test", "trap", "ulimit")),
+        ("literal", _words("true", "false")),
+        ("number", r"\b\d+\b"),
+    ]),
+    # AXL is a Lisp: the word after "(" is the function position, :word and
+    # word: are keywords, and dates like 2025.01.01 are numbers.
+    "axl": _regex_lexer([
+        ("comment", r";[^\n]*"),
+        ("string", r"\"(?:\\.|[^\"\\])*\""),
+        ("symbol", r":[\w?!*+<>=/-]+|[A-Za-z_][\w?!*+<>=/-]*:(?![\w:])"),
+        ("number", r"(?<![\w.])-?\d+(?:\.\d+)*(?:[eE][+-]?\d+)?(?![\w.])"),
+        ("literal", _words("true", "false", "nil", "null")),
+        ("keyword", r"(?<=\()\s*(?:select|update|insert|delete|set|where|let|if|do|def|defn|fn|lambda|"
+                    r"and|or|not|cond|when)(?=[\s()\[\]{}]|$)"),
+        ("name", r"(?<=\()\s*[^\s()\[\]{}\"';]+"),
+    ]),
+}
+BUILTIN_LEXER_ALIASES = {"h": "c", "sh": "bash", "shell": "bash", "zsh": "bash"}
+
+# Pygments token type -> hljs class; subtypes fall back to their parent's entry
+PYGMENTS_HLJS_CLASSES = {
+    "Comment": "comment", "Comment.Preproc": "meta", "Comment.PreprocFile": "string",
+    "Keyword": "keyword", "Keyword.Type": "type", "Keyword.Constant": "literal",
+    "Name.Builtin": "built_in", "Name.Function": "title function_", "Name.Class": "title class_",
+    "Name.Namespace": "title class_", "Name.Exception": "title class_", "Name.Variable": "variable",
+    "Name.Constant": "variable constant_", "Name.Attribute": "attr", "Name.Tag": "name",
+    "Name.Decorator": "meta", "Name.Label": "symbol",
+    "Literal.String": "string", "Literal.String.Escape": "char escape_", "Literal.String.Regex": "regexp",
+    "Literal.String.Symbol": "symbol", "Literal.String.Interpol": "subst",
+    "Literal.Number": "number", "Operator.Word": "keyword",
+    "Generic.Heading": "section", "Generic.Subheading": "section", "Generic.Deleted": "deletion",
+    "Generic.Inserted": "addition", "Generic.Emph": "emphasis", "Generic.Strong": "strong",
+    "Generic.Prompt": "meta",
+}
+_pygments_classes: Dict[object, Optional[str]] = {}
+
+# Highlighted HTML by block key, oldest first. Loaded from
+# HIGHLIGHT_CACHE_PATH on first use; blocks highlighted since are also
+# kept in _highlight_added, for render workers to send back to the build.
+_highlight_cache: Optional[Dict[str, str]] = None
+_highlight_added: Dict[str, str] = {}
+
+
+def _pygments_class(ttype: object) -> Optional[str]:
+    cls = _pygments_classes.get(ttype, "")
+    if cls == "":
+        node = ttype
+        while node is not None and str(node)[6:] not in PYGMENTS_HLJS_CLASSES:  # str() is "Token.X.Y"
+            node = node.parent
+        cls = None if node is None else PYGMENTS_HLJS_CLASSES[str(node)[6:]]
+        _pygments_classes[ttype] = cls
+    return cls
+
+
+@functools.lru_cache(maxsize=None)
+def _pygments_lexer(lang: str) -> Optional[object]:
+    # Cached: looking a lexer up by name scans every lexer module's aliases.
+    pygments = import_pygments()
+    try:
+        return pygments.lexers.get_lexer_by_name(lang, stripnl=False, ensurenl=True)
+    except pygments.util.ClassNotFound:
+        return None
+
+
+def _tokens(code: str, lang: str) -> Optional[List[Tuple[Optional[str], str]]]:
+    """(hljs class or None, text) pairs for `code`, or None if no lexer knows `lang`."""
+    lexer = _pygments_lexer(lang) if import_pygments() is not None else None
+    if lexer is not None:
+        # Lexed with a final newline, which rules such as line comments
+        # need; it is taken off again if `code` had none.
+        tokens = [(_pygments_class(ttype), text) for ttype, text in lexer.get_tokens(code)]
+        if not code.endswith("\n") and tokens and tokens[-1][1].endswith("\n"):
+            cls, text = tokens.pop()
+            if text != "\n":
+                tokens.append((cls, text[:-1]))
+        return tokens
+    rules = BUILTIN_LEXERS.get(BUILTIN_LEXER_ALIASES.get(lang, lang))
+    if rules is None:
+        return None
+    return list(_regex_tokens(code, *rules))
 
-    # Fenced code blocks
-    def fenced_repl(match: re.Match) -> str:
-        lang = match.group(1) or ""
-        code = match.group(2)
-        return (
-            f'<pre class="code"><code class="language-{html.escape(lang)}">'
-            f"{html.escape(code)}"  # preserve code verbatim
-            f"</code></pre>"
-        )
 
-    html_out = re.sub(r"```\s*([A-Za-z0-9_+-]*)\n([\s\S]*?)\n```", fenced_repl, md)
+def _regex_tokens(code: str, regex: "re.Pattern[str]", classes: List[str]) -> Iterator[Tuple[Optional[str], str]]:
+    pos = 0
+    for m in regex.finditer(code):
+        if m.start() > pos:
+            yield None, code[pos:m.start()]
+        yield classes[int(m.lastgroup[1:])], m.group()
+        pos = m.end()
+    if pos < len(code):
+        yield None, code[pos:]
 
-    lines = html_out.splitlines()
+
+def _span(cls: Optional[str], text: str) -> str:
+    text = html.escape(text, False)
+    body = text.rstrip("\n")  # like highlight.js, keep line breaks out of the spans
+    if not cls or not body:
+        return text
+    return f'<span class="hljs-{cls}">{body}</span>' + text[len(body):]
+
+
+def highlight_code(code: str, lang: str) -> Optional[str]:
+    """HTML of `code` with hljs-* spans, or None if `lang` has no lexer."""
+    tokens = _tokens(code, lang.lower())
+    if tokens is None:
+        return None
     out: List[str] = []
-    in_list = False
-    for raw in lines:
-        line = raw.rstrip()
-        if not line.strip():
-            if in_list:
-                out.append("</ul>")
-                in_list = False
-            continue
-        # headings
-        if line.startswith("### "):
-            out.append(f"<h3>{html.escape(line[4:])}</h3>")
-            continue
-        if line.startswith("## "):
-            out.append(f"<h2>{html.escape(line[3:])}</h2>")
-            continue
-        if line.startswith("# "):
-            out.append(f"<h1>{html.escape(line[2:])}</h1>")
-            continue
-        # lists
-        if re.match(r"^\s*[-*] ", line):
-            if not in_list:
-                out.append("<ul>")
-                in_list = True
-            item = re.sub(r"^\s*[-*] ", "", line)
-            # inline code
-            item = re.sub(r"`([^`]+)`", lambda m: f"<code>{html.escape(m.group(1))}</code>", item)
-            out.append(f"<li>{item}</li>")
-            continue
-        # inline code and paragraphs
-        paragraph = re.sub(r"`([^`]+)`", lambda m: f"<code>{html.escape(m.group(1))}</code>", line)
-        out.append(f"<p>{paragraph}</p>")
+    run_cls: Optional[str] = None
+    run: List[str] = []
+    for cls, text in tokens:
+        if cls != run_cls and run:
+            out.append(_span(run_cls, "".join(run)))
+            run = []
+        run_cls = cls
+        run.append(text)
+    out.append(_span(run_cls, "".join(run)))
+    return "".join(out)
+
+
+def load_highlight_cache() -> Dict[str, str]:
+    """This process's highlight cache, read from HIGHLIGHT_CACHE_PATH on first use."""
+    global _highlight_cache
+    if _highlight_cache is None:
+        _highlight_cache = {}
+        try:
+            data = json.loads(HIGHLIGHT_CACHE_PATH.read_text(encoding="utf-8"))
+            if data.get("highlighter") == highlighter_id():
+                _highlight_cache = data["blocks"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+    return _highlight_cache
+
+
+def take_new_highlights() -> Dict[str, str]:
+    """Blocks highlighted by this process since the last call."""
+    global _highlight_added
+    added, _highlight_added = _highlight_added, {}
+    return added
+
+
+def save_highlight_cache(added: Dict[str, str]) -> bool:
+    """Add `added` blocks to the cache and write it, keeping the newest HIGHLIGHT_CACHE_SIZE."""
+    cache = load_highlight_cache()
+    # A serial render already put its blocks into `cache` itself, so
+    # compare nothing against it: any new block means a write.
+    added = {**added, **take_new_highlights()}
+    if not added:
+        return False
+    cache.update(added)
+    for key in list(cache)[:max(0, len(cache) - HIGHLIGHT_CACHE_SIZE)]:
+        del cache[key]
+    write_file(HIGHLIGHT_CACHE_PATH, json.dumps({"highlighter": highlighter_id(), "blocks": cache}))
+    return True
+
+
+def _highlight_repl(m: re.Match) -> str:
+    classes = m.group(2) or ""
+    lang = _LANGUAGE_CLASS_RE.search(classes)
+    body = m.group(3)
+    if lang is not None:
+        code = html.unescape(body)
+        key = _hash_text(f"{lang.group(1)}\0{code}")
+        cache = load_highlight_cache()
+        highlighted = cache.get(key)
+        if highlighted is None:
+            highlighted = highlight_code(code, lang.group(1))
+            if highlighted is not None:
+                cache[key] = _highlight_added[key] = highlighted
+        if highlighted is not None:
+            body = highlighted
+    return f'<pre{m.group(1)}><code class="{(classes + " hljs").strip()}">{body}</code></pre>'
+
+
+def highlight_code_blocks(html_text: str) -> str:
+    """Highlight the <pre><code class="language-*"> blocks of converted HTML.
+
+    Blocks without a known language keep their text, but still get the
+    `hljs` class for the theme's colours.
+    """
+    if "<pre" not in html_text:
+        return html_text
+    return _CODE_BLOCK_RE.sub(_highlight_repl, html_text)
+
 
-    if in_list:
-        out.append("</ul>")
-    return "\n".join(out)
+def renderer_id() -> str:
+    """Identify the Markdown renderer in use; part of every page's build key."""
+    md_mod = import_markdown()
+    if md_mod is None:
+        return f"minimal-{MINIMAL_RENDERER_VERSION}"
+    return "markdown-" + str(getattr(md_mod, "__version__", "unknown"))
 
 
-def convert_markdown(md_text: str) -> str:
+MARKDOWN_EXTENSIONS = [
+    "fenced_code",
+    "tables",
+    "toc",
+    "md_in_html",
+]
+
+
+def new_markdown_converter() -> Optional[object]:
+    """A configured `markdown.Markdown`, or None if the package is missing."""
     md_mod = import_markdown()
     if md_mod is None:
-        return minimal_md_to_html(md_text)
-    md = md_mod.Markdown(extensions=[
-        "fenced_code",
-        "tables",
-        "toc",
-        "md_in_html",
-    ])
-    return md.convert(md_text)
+        return None
+    return md_mod.Markdown(extensions=MARKDOWN_EXTENSIONS)
+
+
+@functools.lru_cache(maxsize=None)
+def markdown_converter() -> Optional[object]:
+    """This process's shared converter; loading extensions is the expensive part."""
+    return new_markdown_converter()
+
+
+def convert_markdown(md_text: str, converter: Optional[object] = None) -> str:
+    """Convert one document with `converter`, or the process's shared one.
+
+    The converter is reset first, so state such as toc ids does not leak
+    between documents. Fenced code comes out highlighted (see
+    highlight_code_blocks()).
+    """
+    md = converter if converter is not None else markdown_converter()
+    if md is None:
+        return highlight_code_blocks(minimal_md_to_html(md_text))
+    md.reset()
+    return highlight_code_blocks(md.convert(md_text))
+
+
+# Converted HTML by source hash, most recently used last. Long-lived
+# processes (the watch loop) skip re-converting pages seen before.
+CONVERT_CACHE_SIZE = 256
+_convert_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def convert_markdown_cached(md_text: str, source_hash: str) -> str:
+    """convert_markdown() with an in-memory LRU keyed by `source_hash`."""
+    key = renderer_id() + ":" + source_hash
+    cached = _convert_cache.get(key)
+    if cached is not None:
+        _convert_cache.move_to_end(key)
+        return cached
+    converted = convert_markdown(md_text)
+    _convert_cache[key] = converted
+    if len(_convert_cache) > CONVERT_CACHE_SIZE:
+        _convert_cache.popitem(last=False)
+    return converted
 
 
 @dataclass
@@ -143,26 +689,74 @@ class DocPage:
     output_path: Path
     url_path: str
     title: str
+    # The Markdown, if discover_docs() had to read it; None for pages
+    # trusted to be unchanged from the manifest.
+    text: Optional[str] = None
+    size: int = 0
+    mtime_ns: int = 0
+
+
+_TITLE_RE = re.compile(r"^# (.*)$", re.M)
 
 
 def derive_title(md_text: str, fallback: str) -> str:
-    for line in md_text.splitlines():
-        if line.startswith("# "):
-            return line[2:].strip()
+    # stops at the first "# " line rather than splitting the whole document
+    m = _TITLE_RE.search(md_text)
+    if m:
+        return m.group(1).strip()
     # fallback to filename with spaces
     name = fallback.replace("-", " ").replace("_", " ")
     return name.title()
 
 
-def discover_docs() -> List[DocPage]:
+def _url_for_source(path: Path) -> str:
+    out_rel = path.relative_to(DOCS_SRC_DIR).with_suffix(".html")
+    return "/docs/" + str(out_rel).replace(os.sep, "/")
+
+
+def _source_for_url(url_path: str) -> Path:
+    return (DOCS_SRC_DIR / url_path[len("/docs/"):]).with_suffix(".md")
+
+
+def _walk_markdown(folder: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    """(path, stat) of every .md file below `folder`, from one scandir() per folder.
+
+    Like Path.rglob(), symlinked folders are not followed, so a link loop
+    cannot recurse forever.
+    """
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_markdown(Path(entry.path))
+            elif entry.name.endswith(".md") and entry.is_file():
+                yield Path(entry.path), entry.stat()
+
+
+def discover_docs(previous: Optional[Dict[str, Dict[str, object]]] = None,
+                  changed: Optional[Set[Path]] = None) -> List[DocPage]:
+    """Find all Markdown pages under docs/, reading each at most once.
+
+    A page is trusted to be unchanged, and not read at all, if its entry in
+    `previous` (the manifest) records the file's current size and mtime, or,
+    in the watch loop, if it is not in the watcher's `changed` set. It then
+    takes its title from the manifest and its `text` stays None. Every
+    other page keeps its text on the DocPage, for build_all() to hash and
+    convert without reading it again.
+    """
+    previous = previous or {}
     pages: List[DocPage] = []
-    for path in sorted(DOCS_SRC_DIR.rglob("*.md")):
+    for path, st in sorted(_walk_markdown(DOCS_SRC_DIR)):
         rel = path.relative_to(DOCS_SRC_DIR)
-        out_rel = rel.with_suffix(".html")
-        out_path = DOCS_OUT_DIR / out_rel
-        url_path = "/docs/" + str(out_rel).replace(os.sep, "/")
-        title = derive_title(path.read_text(encoding="utf-8"), rel.stem)
-        pages.append(DocPage(path, out_path, url_path, title))
+        out_path = DOCS_OUT_DIR / rel.with_suffix(".html")
+        url_path = _url_for_source(path)
+        old = previous.get(url_path)
+        if old is not None and "title" in old and (
+                (old.get("size"), old.get("mtime")) == (st.st_size, st.st_mtime_ns)
+                or (changed is not None and not _is_changed(path, changed))):
+            pages.append(DocPage(path, out_path, url_path, old["title"], None, st.st_size, st.st_mtime_ns))
+            continue
+        text = path.read_text(encoding="utf-8")
+        pages.append(DocPage(path, out_path, url_path, derive_title(text, rel.stem), text, st.st_size, st.st_mtime_ns))
     return pages
 
 
@@ -212,84 +806,202 @@ def build_nav_tree(pages: List[DocPage]) -> NavNode:
     return root
 
 
-def _subtree_contains_url(node: NavNode, url: str) -> bool:
-    if node.page is not None and node.page.url_path == url:
-        return True
-    for child in node.children.values():
-        if _subtree_contains_url(child, url):
-            return True
-    return False
-
-
-def _render_nav(node: NavNode, current_url: str, is_root: bool = False, base_key: str = "") -> str:
-    lines: List[str] = []
-    if is_root:
-        lines.append('<nav class="docs-nav" aria-label="Docs">')
-    lines.append("<ul>")
-    # sort folders and pages by title
-    def sort_key(item: Tuple[str, NavNode]):
-        return item[1].title.lower()
-    for key, child in sorted(node.children.items(), key=sort_key):
-        has_children = len(child.children) > 0
-        li_classes: List[str] = []
-        if has_children:
-            li_classes.append("folder")
-        # determine active class
-        is_active = child.page is not None and child.page.url_path == current_url
-        if is_active:
-            li_classes.append("active")
-        # expanded if subtree contains current
-        is_expanded = has_children and _subtree_contains_url(child, current_url)
-        if is_expanded:
-            li_classes.append("expanded")
-        class_attr = f" class=\"{' '.join(li_classes)}\"" if li_classes else ""
-        data_key = (base_key + "/" + child.name).strip("/")
-        # label/link row with optional toggle
-        if has_children:
-            lines.append(f"  <li data-key=\"{html.escape(data_key)}\"{class_attr}>")
-            lines.append("    <div class=\"nav-row\">")
-            lines.append("      <button class=\"nav-toggle\" aria-label=\"Toggle section\" aria-expanded=\"" + ("true" if is_expanded else "false") + "\"><i class=\"ico fa-solid fa-chevron-right\"></i></button>")
+# Classes of the folder toggle's icon, also scanned by used_icon_classes();
+# the nav script in PAGE_TEMPLATE repeats them for lazily rendered folders
+NAV_TOGGLE_ICON = "ico fa-solid fa-chevron-right"
+
+
+class SidebarRenderer:
+    """Render the sidebar of every page from a single NavNode tree.
+
+    The nav HTML is rendered once, with the per-page bits (the ``class`` of
+    each ``<li>`` and ``aria-expanded`` on folder toggles) kept as separate
+    slots in a list of parts. A URL -> ancestor-chain index records which
+    slots change for a given page, so ``render()`` only touches O(depth)
+    slots before joining, and puts the defaults back afterwards.
+    """
+
+    def __init__(self, tree: NavNode) -> None:
+        self._parts: List[str] = ['<nav class="docs-nav" aria-label="Docs">\n']
+        # (index of the class part, index of the aria-expanded part or -1, is folder)
+        self._slots: List[Tuple[int, int, bool]] = []
+        # url -> slot ids from the top-level entry down to the page's own entry
+        self._chains: Dict[str, Tuple[int, ...]] = {}
+        self._emit(tree, "", ())
+        self._parts.append("\n</nav>")
+        self._digest = _hash_text("".join(self._parts))
+
+    def _emit(self, node: NavNode, base_key: str, chain: Tuple[int, ...]) -> None:
+        out = self._parts
+        out.append("<ul>")
+        # sort folders and pages by title
+        for child in sorted(node.children.values(), key=lambda c: c.title.lower()):
+            has_children = len(child.children) > 0
+            data_key = (base_key + "/" + child.name).strip("/")
+            slot = len(self._slots)
+            out.append(f"\n  <li data-key=\"{html.escape(data_key)}\"")
+            class_idx = len(out)
+            out.append(' class="folder"' if has_children else "")
             if child.page is not None:
-                lines.append(f"      <a href=\"{child.page.url_path}\">{html.escape(child.title)}</a>")
+                label = f"<a href=\"{child.page.url_path}\">{html.escape(child.title)}</a>"
+                self._chains[child.page.url_path] = chain + (slot,)
             else:
-                lines.append(f"      <span>{html.escape(child.title)}</span>")
-            lines.append("    </div>")
-        else:
-            # leaf page
-            if child.page is not None:
-                lines.append(f"  <li data-key=\"{html.escape(data_key)}\"{class_attr}><a href=\"{child.page.url_path}\">{html.escape(child.title)}</a>")
+                label = f"<span>{html.escape(child.title)}</span>"
+            if has_children:
+                out.append(">\n    <div class=\"nav-row\">\n      <button class=\"nav-toggle\" aria-label=\"Toggle section\" aria-expanded=\"")
+                aria_idx = len(out)
+                out.append("false")
+                out.append(f"\"><i class=\"{NAV_TOGGLE_ICON}\"></i></button>\n      {label}\n    </div>\n")
+                self._slots.append((class_idx, aria_idx, True))
+                self._emit(child, data_key, chain + (slot,))
             else:
-                lines.append(f"  <li data-key=\"{html.escape(data_key)}\"{class_attr}><span>{html.escape(child.title)}</span>")
-        # children
-        if has_children:
-            lines.append(_render_nav(child, current_url, False, data_key))
-        lines.append("  </li>")
-    lines.append("</ul>")
-    if is_root:
-        lines.append("</nav>")
-    return "\n".join(lines)
+                out.append(">" + label)
+                self._slots.append((class_idx, -1, False))
+            out.append("\n  </li>")
+        out.append("\n</ul>")
+
+    def signature(self, url: str) -> str:
+        """Hash identifying ``render(url)`` without rendering it."""
+        return _hash_text(self._digest + "\0" + url)
+
+    def render(self, url: str) -> str:
+        parts = self._parts
+        chain = self._chains.get(url, ())
+        last = len(chain) - 1
+        for depth, slot in enumerate(chain):
+            class_idx, aria_idx, is_folder = self._slots[slot]
+            classes = ["folder"] if is_folder else []
+            if depth == last:
+                classes.append("active")
+            if is_folder:
+                # a folder on the chain contains the current page
+                classes.append("expanded")
+                parts[aria_idx] = "true"
+            parts[class_idx] = f" class=\"{' '.join(classes)}\""
+        try:
+            return "".join(parts)
+        finally:
+            for slot in chain:
+                class_idx, aria_idx, is_folder = self._slots[slot]
+                parts[class_idx] = ' class="folder"' if is_folder else ""
+                if is_folder:
+                    parts[aria_idx] = "false"
 
 
-def build_sidebar(pages: List[DocPage], current: DocPage) -> str:
-    tree = build_nav_tree(pages)
-    return _render_nav(tree, current.url_path, is_root=True)
+NAV_MODES = ("full", "lazy")
+NAV_JSON_PATH = DOCS_OUT_DIR / "nav.json"
+NAV_JSON_URL = "/docs/nav.json"
 
 
-def render_template(css: str, sidebar_html: str, content_html: str, page_title: str, base_prefix: str) -> str:
-    """Return a full HTML page using the main site's CSS and header.
+class LazySidebarRenderer(SidebarRenderer):
+    """Sidebars for ``--nav-mode lazy``, which grow with depth, not with the tree.
+
+    A page inlines only the entries along its own path: the top level and
+    the contents of each folder it sits in. Other folders come collapsed
+    and empty; the page script fills them in from the whole tree, written
+    once to NAV_JSON_PATH (see nav_json()), when they are first expanded.
+    Adding a page then only changes the sidebars of the pages next to it.
+    The markup is otherwise the same as SidebarRenderer's.
 
-    Uses simple placeholder tokens to avoid brace escaping issues.
+    Every folder's list is pre-rendered collapsed, so ``render()`` joins
+    one list per level and renders only the entries on the page's path.
     """
-    tpl = """<!DOCTYPE html>
-<html lang=\"en\">
-<head>
-  <meta charset=\"utf-8\" />
-  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-  <title>__TITLE__ — AXL DB Docs</title>
-  <meta name=\"description\" content=\"AXL DB Documentation\" />
-  <style>
-__CSS__
-    /* Emphasize identifiers and keywords in code with light blue + bold */
+
+    def __init__(self, tree: NavNode) -> None:
+        # Per folder (0 is the top level): its entries as (name, data key,
+        # title, url, folder id or -1), and their collapsed HTML. No DocPage
+        # references, so it pickles small for the render workers.
+        self._entries: List[List[Tuple[str, str, str, str, int]]] = []
+        self._html: List[List[str]] = []
+        # url -> index of the entry at each level, from the top level down to the page
+        self._paths: Dict[str, Tuple[int, ...]] = {}
+        self._add_folder(tree, "", ())
+        # Hash per folder of everything its collapsed list shows
+        self._digests = [_hash_text("".join(items)) for items in self._html]
+
+    def _add_folder(self, node: NavNode, base_key: str, path: Tuple[int, ...]) -> int:
+        folder = len(self._entries)
+        entries: List[Tuple[str, str, str, str, int]] = []
+        self._entries.append(entries)
+        self._html.append([])
+        for i, child in enumerate(sorted(node.children.values(), key=lambda c: c.title.lower())):
+            data_key = (base_key + "/" + child.name).strip("/")
+            url = child.page.url_path if child.page is not None else ""
+            if url:
+                self._paths[url] = path + (i,)
+            sub = self._add_folder(child, data_key, path + (i,)) if child.children else -1
+            entries.append((child.name, data_key, child.title, url, sub))
+        self._html[folder] = [self._item(entry, False, False) for entry in entries]
+        return folder
+
+    @staticmethod
+    def _item(entry: Tuple[str, str, str, str, int], active: bool, expanded: bool) -> str:
+        """An entry's <li>, without the folder's list and closing tag if `expanded`."""
+        _, data_key, title, url, sub = entry
+        classes = ["folder"] if sub >= 0 else []
+        if active:
+            classes.append("active")
+        if expanded:
+            classes.append("expanded")
+        class_attr = f" class=\"{' '.join(classes)}\"" if classes else ""
+        label = f"<a href=\"{url}\">{html.escape(title)}</a>" if url else f"<span>{html.escape(title)}</span>"
+        head = f"\n  <li data-key=\"{html.escape(data_key)}\"{class_attr}"
+        if sub < 0:
+            return head + ">" + label + "\n  </li>"
+        row = (f">\n    <div class=\"nav-row\">\n      <button class=\"nav-toggle\" aria-label=\"Toggle section\" "
+               f"aria-expanded=\"{'true' if expanded else 'false'}\"><i class=\"{NAV_TOGGLE_ICON}\"></i></button>\n"
+               f"      {label}\n    </div>")
+        return head + row + ("\n" if expanded else "\n  </li>")
+
+    def nav_json(self) -> str:
+        """The tree as nested ``[name, title, url, children]`` lists; leaves have no children."""
+        def encode(folder: int) -> list:
+            return [[name, title, url, encode(sub)] if sub >= 0 else [name, title, url]
+                    for name, _, title, url, sub in self._entries[folder]]
+        return json.dumps(encode(0), ensure_ascii=False, separators=(",", ":"))
+
+    def signature(self, url: str) -> str:
+        """Hash of the lists on the page's path and its position in them."""
+        path = self._paths.get(url, ())
+        folder, digests = 0, [self._digests[0]]
+        for i in path:
+            folder = self._entries[folder][i][4]
+            if folder < 0:
+                break
+            digests.append(self._digests[folder])
+        return _hash_text(":".join(digests) + "\0" + ",".join(map(str, path)))
+
+    def render(self, url: str) -> str:
+        out = [f'<nav class="docs-nav" aria-label="Docs" data-src="{NAV_JSON_URL}">\n']
+        self._emit(0, self._paths.get(url, ()), 0, out)
+        out.append("\n</nav>")
+        return "".join(out)
+
+    def _emit(self, folder: int, path: Tuple[int, ...], depth: int, out: List[str]) -> None:
+        items = self._html[folder]
+        out.append("<ul>")
+        if depth < len(path):
+            i = path[depth]
+            entry = self._entries[folder][i]
+            expanded = entry[4] >= 0
+            out.extend(items[:i])
+            out.append(self._item(entry, depth == len(path) - 1, expanded))
+            if expanded:
+                self._emit(entry[4], path, depth + 1, out)
+                out.append("\n  </li>")
+            out.extend(items[i + 1:])
+        else:
+            out.extend(items)
+        out.append("\n</ul>")
+
+
+def build_sidebar(pages: List[DocPage], current: DocPage) -> str:
+    """Sidebar for a single page. Builds should share one SidebarRenderer."""
+    return SidebarRenderer(build_nav_tree(pages)).render(current.url_path)
+
+
+# Docs-only rules, appended after the main site's CSS.
+DOCS_CSS = """    /* Emphasize identifiers and keywords in code with light blue + bold */
     .hljs-keyword,
     .hljs-title,
     .hljs-variable,
@@ -321,25 +1033,405 @@ __CSS__
     .docs-content pre{background: var(--code, #0b111b); border-radius:12px; padding:14px; margin:16px 0; overflow:auto; box-shadow: inset 0 1px 0 rgba(255,255,255,0.04), 0 8px 20px rgba(0,0,0,0.25)}
     .docs-content pre code{background: transparent !important}
     .docs-content pre, .docs-content code{font-family: "JetBrains Mono", ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace; font-size:.9rem}
+    .docs-search{position:relative; flex:1; max-width:360px; margin-left:auto}
+    .docs-search input{width:100%; padding:9px 12px; border-radius:8px; border:1px solid var(--border); background:var(--panel); color:var(--text); font:inherit}
+    .docs-search input:focus{outline:none; border-color:rgba(255,178,36,.5)}
+    .docs-search-results{position:absolute; z-index:10; top:calc(100% + 6px); left:0; right:0; margin:0; padding:6px; list-style:none; background:var(--panel); border:1px solid var(--border); border-radius:var(--radius-sm); box-shadow:var(--shadow); max-height:60vh; overflow:auto}
+    .docs-search-results li{padding:8px 10px; color:var(--muted)}
+    .docs-search-results li:has(a){padding:0}
+    .docs-search-results a{display:block; padding:8px 10px; color:var(--text); text-decoration:none; border-radius:8px}
+    .docs-search-results a:hover, .docs-search-results a:focus{background:rgba(255,178,36,.10)}
+    .docs-search-results small{display:block; color:var(--muted)}
     @media (max-width: 960px){ .docs-layout{grid-template-columns:1fr} }
-  </style>
-  <link rel=\"icon\" type=\"image/svg+xml\" href=\"../axl-logo.svg\"> 
-  <link rel=\"stylesheet\" href=\"../vendor/fontawesome/css/all.min.css\" />
-  <link rel=\"stylesheet\" href=\"https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;600&display=swap\" />
-  <link rel=\"stylesheet\" href=\"https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/atom-one-dark-reasonable.min.css\" />
+"""
+
+
+def render_style(css: str) -> str:
+    """Contents of the page's <style> element for the given site CSS."""
+    return "\n" + css + "\n" + DOCS_CSS + "  "
+
+
+def inline_styles(css: str) -> str:
+    """Style markup that inlines all of the CSS into the page."""
+    return "<style>" + render_style(css) + "</style>"
+
+
+CSS_MODES = ("inline", "external")
+STYLESHEET_DIR = DOCS_OUT_DIR / "assets"
+# Selectors styling what is visible before the first scroll: the header,
+# the layout grid and the base typography.
+CRITICAL_SELECTORS = (":root", "*", "html", "body", "a", ".container", ".nav", ".brand", ".logo",
+                      ".btn", ".features", ".section-head", ".docs-layout")
+
+
+def _css_rules(css: str) -> List[Tuple[str, str]]:
+    """Top-level (prelude, full rule text) pairs; at-rule blocks are one pair."""
+    css = re.sub(r"/\*[\s\S]*?\*/", "", css)
+    rules: List[Tuple[str, str]] = []
+    depth = 0
+    start = 0
+    for i, ch in enumerate(css):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                rule = css[start:i + 1].strip()
+                rules.append((rule[:rule.index("{")].strip(), rule))
+                start = i + 1
+    return rules
+
+
+def critical_css(css: str) -> str:
+    """The rules of `css` whose selectors match CRITICAL_SELECTORS.
+
+    At-rules (media queries, keyframes) are left to the full stylesheet.
+    """
+    keep: List[str] = []
+    for prelude, rule in _css_rules(css):
+        if prelude.startswith("@"):
+            continue
+        for selector in prelude.split(","):
+            head = re.split(r"[\s>+~:.\[]", selector.strip()[1:], maxsplit=1)[0]
+            name = selector.strip()[:1] + head
+            if selector.strip() in CRITICAL_SELECTORS or name in CRITICAL_SELECTORS:
+                keep.append(rule)
+                break
+    return "\n".join(keep)
+
+
+def write_stylesheet(css: str) -> Tuple[Path, bool]:
+    """Write site + docs CSS to assets/docs.<hash>.css, removing older versions.
+
+    Returns the stylesheet's path and whether it had to be written.
+    """
+    content = css + "\n" + DOCS_CSS
+    path = STYLESHEET_DIR / f"docs.{_hash_text(content)[:12]}.css"
+    created = not path.exists()
+    if created:
+        write_file(path, content)
+    remove_stylesheets(keep=path)
+    return path, created
+
+
+def remove_stylesheets(keep: Optional[Path] = None) -> None:
+    """Delete generated stylesheets (and compressed siblings) other than `keep`."""
+    for old in STYLESHEET_DIR.glob("docs.*.css*"):
+        if keep is None or old.name.split(".css")[0] != keep.stem:
+            old.unlink()
+
+
+def build_styles(css: str, stylesheet: Optional[Path] = None, critical: bool = False) -> str:
+    """Style markup shared by every page of a build.
+
+    Without `stylesheet` all CSS is inlined. Otherwise the page links that
+    stylesheet (see write_stylesheet()), which browsers cache across pages;
+    with `critical`, the above-the-fold rules are also inlined so the
+    header renders before the stylesheet arrives.
+    """
+    if stylesheet is None:
+        return inline_styles(css)
+    href = "../" + stylesheet.relative_to(SITE_DIR).as_posix()
+    styles = f'<link rel="stylesheet" href="{href}" />'
+    if critical:
+        styles = f"<style>\n{critical_css(css + DOCS_CSS)}\n  </style>\n  " + styles
+    return styles
+
+
+# --- Vendored assets -----------------------------------------------------
+#
+# Pages link the highlight.js theme, JetBrains Mono and Font Awesome from
+# site/docs/assets/vendor/ under content-hashed names, so they load without
+# third-party round-trips and can be cached forever. The theme and the
+# font come from VENDOR_CACHE_DIR, filled by --fetch-vendor; whatever is
+# missing from it keeps its CDN link. Font Awesome is cut down to the
+# icons named in site/index.html and the docs.
+
+VENDOR_CACHE_DIR = ROOT_DIR / ".vendor-cache"
+VENDOR_OUT_DIR = STYLESHEET_DIR / "vendor"
+FONTAWESOME_DIR = SITE_DIR / "vendor" / "fontawesome"
+HLJS_VERSION = "11.9.0"
+HLJS_CDN = f"https://cdnjs.cloudflare.com/ajax/libs/highlight.js/{HLJS_VERSION}/"
+HLJS_STYLE = "styles/atom-one-dark-reasonable.min.css"
+WEBFONT_CSS_URL = "https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;600&display=swap"
+WEBFONT_CACHE_DIR = VENDOR_CACHE_DIR / "jetbrains-mono"
+# Google Fonts picks the font format from the User-Agent; this one gets woff2.
+FETCH_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+# Font Awesome style classes -> the (font-family, font-weight) face they render with
+FA_STYLE_FACES = {
+    "fa-solid": ("Font Awesome 6 Free", "900"), "fas": ("Font Awesome 6 Free", "900"),
+    "fa-regular": ("Font Awesome 6 Free", "400"), "far": ("Font Awesome 6 Free", "400"),
+    "fa-brands": ("Font Awesome 6 Brands", "400"), "fab": ("Font Awesome 6 Brands", "400"),
+}
+
+_CSS_URL_RE = re.compile(r"url\(\s*['\"]?([^)'\"]+)['\"]?\s*\)")
+_CLASS_ATTR_RE = re.compile(r"""\bclass\s*=\s*["']([^"']*)["']""")
+_FA_SELECTOR_CLASS_RE = re.compile(r"\.(fa[a-z0-9-]*)")
+_FONT_FAMILY_RE = re.compile(r"font-family:\s*[\"']([^\"']+)[\"']")
+_FONT_WEIGHT_RE = re.compile(r"font-weight:\s*(\d+)")
+_FONT_SRC_RE = re.compile(r"src:[^;}]*")
+_KEYFRAMES_RE = re.compile(r"@(?:-webkit-)?keyframes\s+([\w-]+)")
+_ICON_CODEPOINT_RE = re.compile(r"content:\s*\"\\([0-9a-fA-F]+)\"")
+
+
+def icon_classes(text: str) -> Set[str]:
+    """Font Awesome classes (``fa-*``, ``fas``, ...) named in class attributes of `text`."""
+    return {name for m in _CLASS_ATTR_RE.finditer(text) for name in m.group(1).split()
+            if name == "fa" or name.startswith("fa-") or name in FA_STYLE_FACES}
+
+
+def used_icon_classes(page_icons: Iterable[str] = ()) -> Set[str]:
+    """Icon classes of site/index.html, the page template and the sidebar, plus `page_icons`."""
+    text = PAGE_TEMPLATE + f'<i class="{NAV_TOGGLE_ICON}">'
+    if INDEX_HTML.exists():
+        text += INDEX_HTML.read_text(encoding="utf-8")
+    return icon_classes(text) | set(page_icons)
+
+
+def _fetch(url: str) -> bytes:
+    request = urllib.request.Request(url, headers={"User-Agent": FETCH_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def fetch_vendor() -> bool:
+    """Download the highlight.js theme and JetBrains Mono into VENDOR_CACHE_DIR, for --fetch-vendor.
+
+    The font's stylesheet is cached with its url()s pointing at the cached
+    font files. Returns False if a download failed.
+    """
+    try:
+        write_bytes_atomic(VENDOR_CACHE_DIR / "highlight.js" / HLJS_VERSION / HLJS_STYLE, _fetch(HLJS_CDN + HLJS_STYLE))
+        font_css = _fetch(WEBFONT_CSS_URL).decode("utf-8")
+        for url in dict.fromkeys(_CSS_URL_RE.findall(font_css)):
+            name = url.rsplit("/", 1)[-1]
+            write_bytes_atomic(WEBFONT_CACHE_DIR / name, _fetch(url))
+            font_css = font_css.replace(url, name)
+        write_bytes_atomic(WEBFONT_CACHE_DIR / "fonts.css", font_css.encode("utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not fetch vendor assets ({e}); missing ones stay on their CDN")
+        return False
+    print(f"📥 Vendor assets cached in {VENDOR_CACHE_DIR}")
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def import_fonttools() -> Optional[object]:
+    try:
+        from fontTools import subset  # type: ignore
+        return subset
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def fonttools_version() -> Optional[str]:
+    """The installed fontTools version, or None; cheaper than import_fonttools()."""
+    try:
+        import fontTools  # type: ignore
+        return fontTools.version
+    except Exception:
+        return None
+
+
+def subset_font(data: bytes, codepoints: Set[int]) -> bytes:
+    """Cut the woff2 font `data` down to `codepoints`.
+
+    Needs fontTools (and brotli, for woff2); without them, or if
+    subsetting fails, the font is returned whole.
+    """
+    subset = import_fonttools()
+    if subset is None or not codepoints:
+        return data
+    try:
+        options = subset.Options()
+        options.flavor = "woff2"
+        font = subset.load_font(io.BytesIO(data), options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        out = io.BytesIO()
+        subset.save_font(font, out, options)
+        return out.getvalue()
+    except Exception:
+        return data
+
+
+# Subset fonts from earlier builds, kept as <font>.<key>.woff2 with only
+# the newest subset of each font (see cached_subset_font())
+FONT_SUBSET_CACHE_DIR = BUILD_CACHE_DIR / "font-subsets"
+
+
+def cached_subset_font(name: str, data: bytes, codepoints: Set[int]) -> bytes:
+    """subset_font(), reusing an earlier build's subset of the font file `name`.
+
+    The subset is looked up by the font's sha256, the code points and the
+    fontTools version, so a build whose icons have not changed does not
+    even import the subsetter.
+    """
+    version = fonttools_version()
+    if version is None or not codepoints:
+        return data
+    key = hashlib.sha256(data)
+    key.update(f"{','.join(map(str, sorted(codepoints)))}:{version}".encode("utf-8"))
+    stem = name.rsplit(".", 1)[0]
+    path = FONT_SUBSET_CACHE_DIR / f"{stem}.{key.hexdigest()[:16]}.woff2"
+    try:
+        return path.read_bytes()
+    except OSError:
+        pass
+    out = subset_font(data, codepoints)
+    if out is not data:  # a failed subset is retried next build
+        for old in FONT_SUBSET_CACHE_DIR.glob(f"{stem}.*.woff2"):
+            old.unlink(missing_ok=True)
+        write_bytes_atomic(path, out)
+    return out
+
+
+def _subset_fa_rules(css: str, used: Set[str], faces: Set[Tuple[str, str]]) -> List[str]:
+    """The rules of Font Awesome's `css` needed to render the `used` classes.
+
+    A selector is kept when every Font Awesome class it names is used, so
+    `.fa-bolt:before` goes with fa-bolt and `:root` always stays. Only
+    @font-face rules for `faces` are kept, and keyframes only when a kept
+    rule animates with them.
+    """
+    keep: List[str] = []
+    deferred: List[Tuple[str, str]] = []
+    for prelude, rule in _css_rules(css):
+        if prelude.startswith("@font-face"):
+            family = _FONT_FAMILY_RE.search(rule)
+            weight = _FONT_WEIGHT_RE.search(rule)
+            if family and (family.group(1), weight.group(1) if weight else "400") in faces:
+                keep.append(rule)
+        elif prelude.startswith("@media") or prelude.startswith("@supports"):
+            inner = _subset_fa_rules(rule[rule.index("{") + 1:-1], used, faces)
+            if inner:
+                keep.append(prelude + "{" + "".join(inner) + "}")
+        elif prelude.startswith("@"):
+            deferred.append((prelude, rule))
+        else:
+            selectors = [s for s in prelude.split(",") if set(_FA_SELECTOR_CLASS_RE.findall(s)) <= used]
+            if selectors:
+                keep.append(",".join(selectors) + rule[len(prelude):])
+    kept = "".join(keep)
+    for prelude, rule in deferred:
+        name = _KEYFRAMES_RE.match(prelude)
+        if name is None or re.search(rf"animation(?:-name)?:[^;}}]*\b{re.escape(name.group(1))}\b", kept):
+            keep.append(rule)
+    return keep
+
+
+def fontawesome_subset(used: Set[str]) -> Tuple[str, Dict[str, bytes]]:
+    """Font Awesome CSS for the `used` classes, and the woff2 fonts it needs.
+
+    The CSS refers to each font by its file name in site/vendor/fontawesome/
+    webfonts/; the fonts are subset to the icons' code points when
+    fontTools is installed (see subset_font() and cached_subset_font()).
+    """
+    styles = {cls for cls in used if cls in FA_STYLE_FACES}
+    # Icons without a style class render solid
+    faces = {FA_STYLE_FACES[cls] for cls in styles} | {FA_STYLE_FACES["fa-solid"]}
+    rules = _subset_fa_rules((FONTAWESOME_DIR / "css" / "all.min.css").read_text(encoding="utf-8"), used, faces)
+    css = "".join(rules)
+    codepoints = {int(cp, 16) for cp in _ICON_CODEPOINT_RE.findall(css)}
+    fonts: Dict[str, bytes] = {}
+    for m in _CSS_URL_RE.finditer(css):
+        name = m.group(1).rsplit("/", 1)[-1]
+        if name.endswith(".woff2") and name not in fonts:
+            fonts[name] = cached_subset_font(name, (FONTAWESOME_DIR / "webfonts" / name).read_bytes(), codepoints)
+
+    def woff2_only(src: re.Match) -> str:
+        woff2 = [u for u in _CSS_URL_RE.findall(src.group(0)) if u.endswith(".woff2")]
+        return f'src:url({woff2[0].rsplit("/", 1)[-1]}) format("woff2")' if woff2 else src.group(0)
+    return _FONT_SRC_RE.sub(woff2_only, css), fonts
+
+
+def write_vendor_asset(name: str, data: bytes) -> Tuple[Path, bool]:
+    """Write `data` to VENDOR_OUT_DIR as <stem>.<hash><suffix>; returns (path, whether written)."""
+    stem, suffix = name.rsplit(".", 1)
+    path = VENDOR_OUT_DIR / f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{suffix}"
+    if path.exists():
+        return path, False
+    write_bytes_atomic(path, data)
+    return path, True
+
+
+def _relink_css(css: str, names: Dict[str, Path]) -> str:
+    """Point the url()s of `css` that name a key of `names` at its hashed file."""
+    return _CSS_URL_RE.sub(lambda m: f"url({names[m.group(1)].name})" if m.group(1) in names else m.group(0), css)
+
+
+def build_vendor_assets(icons: Set[str]) -> Tuple[str, List[Path]]:
+    """Write the vendored CSS and fonts; returns their head markup and the new files.
+
+    All the CSS goes into one vendor.<hash>.css; code is highlighted at
+    build time (see highlight_code_blocks()), so no script is needed.
+    Files from earlier builds are removed. Like build_styles(), links are written for a page
+    in docs/.
+    """
+    written: List[Path] = []
+    keep: Set[Path] = set()
+
+    def add(name: str, data: bytes) -> Path:
+        path, created = write_vendor_asset(name, data)
+        keep.add(path)
+        if created:
+            written.append(path)
+        return path
+
+    css_parts: List[str] = []
+    links: List[str] = []
+    if (FONTAWESOME_DIR / "css" / "all.min.css").exists():
+        fa_css, fa_fonts = fontawesome_subset(icons)
+        css_parts.append(_relink_css(fa_css, {name: add(name, data) for name, data in fa_fonts.items()}))
+    font_css = WEBFONT_CACHE_DIR / "fonts.css"
+    if font_css.exists():
+        css = font_css.read_text(encoding="utf-8")
+        names = {name: add(name, (WEBFONT_CACHE_DIR / name).read_bytes()) for name in set(_CSS_URL_RE.findall(css))}
+        css_parts.append(_relink_css(css, names))
+    else:
+        links.append(f'<link rel="stylesheet" href="{WEBFONT_CSS_URL}" />')
+    hljs_dir = VENDOR_CACHE_DIR / "highlight.js" / HLJS_VERSION
+    if (hljs_dir / HLJS_STYLE).exists():
+        css_parts.append((hljs_dir / HLJS_STYLE).read_text(encoding="utf-8"))
+    else:
+        links.append(f'<link rel="stylesheet" href="{HLJS_CDN}{HLJS_STYLE}" />')
+    if css_parts:
+        sheet = add("vendor.css", "\n".join(css_parts).encode("utf-8"))
+        links.insert(0, f'<link rel="stylesheet" href="../{sheet.relative_to(SITE_DIR).as_posix()}" />')
+    if VENDOR_OUT_DIR.is_dir():
+        for old in VENDOR_OUT_DIR.iterdir():
+            source = old.with_suffix("") if old.suffix in COMPRESSED_VARIANTS else old
+            if source not in keep:
+                old.unlink()
+    return "\n  ".join(links), written
+
+
+# The page template. Slots are __NAME__ tokens, filled by render_template();
+# __BASE__ is the relative path from the page back to the site root.
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang=\"en\">
+<head>
+  <meta charset=\"utf-8\" />
+  <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
+  <title>__TITLE__ — AXL DB Docs</title>
+  <meta name=\"description\" content=\"AXL DB Documentation\" />
+  __STYLES__
+  <link rel=\"icon\" type=\"image/svg+xml\" href=\"__BASE__/axl-logo.svg\"> 
 </head>
 <body>
   <header class=\"nav\" role=\"banner\" aria-label=\"Primary\">
     <div class=\"container nav-inner\">
-      <a class=\"brand\" href=\"../index.html#top\" aria-label=\"AXL DB home\">
-        <img class=\"logo\" src=\"../axl-logo.svg\" alt=\"AXL logo\" width=\"28\" height=\"28\"/>
+      <a class=\"brand\" href=\"__BASE__/index.html#top\" aria-label=\"AXL DB home\">
+        <img class=\"logo\" src=\"__BASE__/axl-logo.svg\" alt=\"AXL logo\" width=\"28\" height=\"28\"/>
         <span>AXL DB</span>
       </a>
       <nav class=\"nav-links\" aria-label=\"Main\">
-        <a href=\"../index.html#features\">Features</a>
-        <a href=\"../index.html#performance\">Performance</a>
-        <a href=\"../index.html#use-cases\">Use cases</a>
-        <a href=\"../index.html#get-started\">Get started</a>
+        <a href=\"__BASE__/index.html#features\">Features</a>
+        <a href=\"__BASE__/index.html#performance\">Performance</a>
+        <a href=\"__BASE__/index.html#use-cases\">Use cases</a>
+        <a href=\"__BASE__/index.html#get-started\">Get started</a>
         <a class=\"btn ghost\" href=\"https://github.com/singaraiona/axl\" target=\"_blank\" rel=\"noopener noreferrer\"><i class=\"ico fa-brands fa-github\" aria-hidden=\"true\"></i>GitHub</a>
       </nav>
     </div>
@@ -348,7 +1440,11 @@ __CSS__
     <div class=\"container\">
       <div class=\"section-head\" style=\"align-items:center\"> 
         <h2>__TITLE__</h2>
-        <a class=\"btn ghost\" href=\"../index.html\">Back to site</a>
+        <form class=\"docs-search\" role=\"search\" hidden>
+          <input type=\"search\" placeholder=\"Search docs\" aria-label=\"Search docs\" autocomplete=\"off\" />
+          <ol class=\"docs-search-results\" hidden></ol>
+        </form>
+        <a class=\"btn ghost\" href=\"__BASE__/index.html\">Back to site</a>
       </div>
       <div class=\"docs-layout\">
         <aside class=\"docs-sidebar\">__SIDEBAR__</aside>
@@ -367,23 +1463,48 @@ __CSS__
       <div>© <span id=\"y\"></span> AXL DB. All rights reserved.</div>
     </div>
   </footer>
-  <script src=\"https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js\"></script>
-  <script src=\"https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/c.min.js\"></script>
-  <script src=\"https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/languages/bash.min.js\"></script>
   <script>
     document.addEventListener('DOMContentLoaded', function(){
-      if(window.hljs){ hljs.highlightAll(); }
       var y = document.getElementById('y'); if(y){ y.textContent = new Date().getFullYear(); }
       // Sidebar toggle persistence
       var nav = document.querySelector('.docs-nav');
       if(!nav) return;
       var lsKey = 'axl:docs:open';
       var openSet = new Set(JSON.parse(localStorage.getItem(lsKey) || '[]'));
-      // restore expanded from localStorage
-      openSet.forEach(function(key){
-        var li = nav.querySelector('li[data-key="'+key+'"]');
-        if(li){ li.classList.add('expanded'); var btn = li.querySelector('.nav-toggle'); if(btn){ btn.setAttribute('aria-expanded','true'); } }
-      });
+      // With --nav-mode lazy, folders off this page's path come empty and are
+      // filled in from the nav JSON (data-src) the first time they open.
+      var navSrc = nav.getAttribute('data-src'), navTree = null;
+      function esc(s){ return String(s).replace(/[&<>"']/g, function(c){ return {'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#x27;'}[c]; }); }
+      function renderItems(items, base){
+        return '<ul>' + items.map(function(n){
+          var key = esc(base ? base + '/' + n[0] : n[0]);
+          var label = n[2] ? '<a href="'+n[2]+'">'+esc(n[1])+'</a>' : '<span>'+esc(n[1])+'</span>';
+          if(!n[3]) return '\\n  <li data-key="'+key+'">'+label+'\\n  </li>';
+          return '\\n  <li data-key="'+key+'" class="folder">\\n    <div class="nav-row">\\n      <button class="nav-toggle" aria-label="Toggle section" aria-expanded="false">'
+            + '<i class="ico fa-solid fa-chevron-right"></i></button>\\n      '+label+'\\n    </div>\\n  </li>';
+        }).join('') + '\\n</ul>';
+      }
+      function fill(li){
+        if(!navSrc || li.querySelector(':scope > ul')) return Promise.resolve();
+        navTree = navTree || fetch(navSrc).then(function(r){ return r.json(); });
+        return navTree.then(function(items){
+          var key = li.getAttribute('data-key') || '';
+          key.split('/').forEach(function(name){
+            var n = (items || []).find(function(n){ return n[0] === name; });
+            items = n && n[3];
+          });
+          if(items && !li.querySelector(':scope > ul')){ li.insertAdjacentHTML('beforeend', renderItems(items, key)); }
+        }, function(){ navTree = null; });
+      }
+      // restore expanded from localStorage, outer folders first so lazy ones get filled in
+      Array.from(openSet).sort(function(a, b){ return a.split('/').length - b.split('/').length; }).reduce(function(done, key){
+        return done.then(function(){
+          var li = nav.querySelector('li[data-key="'+key+'"]');
+          if(!li) return;
+          li.classList.add('expanded'); var btn = li.querySelector('.nav-toggle'); if(btn){ btn.setAttribute('aria-expanded','true'); }
+          return fill(li);
+        });
+      }, Promise.resolve());
       nav.addEventListener('click', function(e){
         var btn = e.target.closest('.nav-toggle');
         if(!btn) return;
@@ -393,6 +1514,7 @@ __CSS__
         var key = li.getAttribute('data-key') || '';
         var expanded = li.classList.toggle('expanded');
         btn.setAttribute('aria-expanded', expanded ? 'true' : 'false');
+        if(expanded) fill(li);
         if(key){
           if(expanded) openSet.add(key); else openSet.delete(key);
           localStorage.setItem(lsKey, JSON.stringify(Array.from(openSet)));
@@ -403,49 +1525,1106 @@ __CSS__
 </body>
 </html>"""
 
-    result = (
-        tpl
-        .replace("__CSS__", css)
-        .replace("__SIDEBAR__", sidebar_html)
-        .replace("__CONTENT__", content_html)
-        .replace("__TITLE__", html.escape(page_title))
-    )
-    # Adjust asset/base links if rendering at site root (e.g., docs.html)
+TEMPLATE_SLOT_RE = re.compile(r"__(STYLES|SIDEBAR|CONTENT|TITLE|BASE)__")
+
+
+def compile_template(template: str) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """Split `template` into literal parts and (part index, slot name) pairs.
+
+    The slots' entries in the parts list are placeholders, overwritten for
+    each page before joining.
+    """
+    parts: List[str] = []
+    slots: List[Tuple[int, str]] = []
+    pos = 0
+    for m in TEMPLATE_SLOT_RE.finditer(template):
+        parts.append(template[pos:m.start()])
+        slots.append((len(parts), m.group(1)))
+        parts.append("")
+        pos = m.end()
+    parts.append(template[pos:])
+    return parts, slots
+
+
+_TEMPLATE_PARTS, _TEMPLATE_SLOTS = compile_template(PAGE_TEMPLATE)
+
+
+def render_template(styles: str, sidebar_html: str, content_html: str, page_title: str, base_prefix: str) -> str:
+    """Return a full HTML page using the main site's CSS and header.
+
+    `styles` is the page's style markup, from inline_styles() or
+    build_styles(); its links are written relative to a page in docs/ and
+    get rebased for deeper pages. The sidebar uses absolute URLs, and the
+    content is inserted untouched.
+
+    The template is split once at import (see compile_template()), so a
+    page is assembled with a single join.
+    """
+    values = {
+        "STYLES": _rebase_links(styles, base_prefix),
+        "SIDEBAR": sidebar_html,
+        "CONTENT": content_html,
+        "TITLE": html.escape(page_title),
+        "BASE": base_prefix,
+    }
+    parts = _TEMPLATE_PARTS.copy()
+    for index, name in _TEMPLATE_SLOTS:
+        parts[index] = values[name]
+    return "".join(parts)
+
+
+def _rebase_links(text: str, base_prefix: str) -> str:
+    """Rewrite "../" links, written for a page in docs/, for `base_prefix`."""
     if base_prefix != "..":
-        result = result.replace("../", f"{base_prefix}/")
-    return result
+        return text.replace("../", f"{base_prefix}/")
+    return text
 
 
-def write_file(path: Path, content: str) -> None:
+def _base_prefix(page: DocPage) -> str:
+    """Relative path from the page's directory back to the site root."""
+    rel_from_docs = page.output_path.relative_to(DOCS_OUT_DIR)
+    depth_dirs = len(rel_from_docs.parts) - 1  # number of parent directories under docs/
+    if depth_dirs <= 0:
+        return ".."
+    return "/".join([".."] * (depth_dirs + 1))
+
+
+# sha256 of the files this process wrote, or found already up to date, since
+# build_all() started; the asset manifest takes its hashes from here.
+_output_hashes: Dict[Path, str] = {}
+
+
+def write_bytes_atomic(path: Path, data: bytes, mtime_ns: Optional[int] = None) -> None:
+    """Write `data` to a temporary file next to `path`, then rename it over `path`.
+
+    Readers such as a running server.py see either the old file or the new
+    one, never a partial write. With `mtime_ns`, the new file gets that
+    mtime before it appears.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        if mtime_ns is not None:
+            os.utime(tmp, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _output_hashes[path] = hashlib.sha256(data).hexdigest()
 
 
-def build_all() -> List[Path]:
-    css = read_site_css()
-    pages = discover_docs()
+def write_file(path: Path, content: str) -> None:
+    write_bytes_atomic(path, content.encode("utf-8"))
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write `content` unless the file already holds exactly that; returns whether it wrote.
+
+    Comparing sizes first means a changed file is rarely read back. An
+    unchanged file keeps its mtime, so its ETag, its precompressed
+    siblings and rsync-style deploys are left alone.
+    """
+    data = content.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            _output_hashes[path] = hashlib.sha256(data).hexdigest()
+            return False
+    except OSError:
+        pass
+    write_bytes_atomic(path, data)
+    return True
+
+
+def prune_outputs(keep: Set[Path]) -> List[Path]:
+    """Delete site/docs/**/*.html not in `keep`, their precompressed siblings and emptied folders.
+
+    Pages whose Markdown was deleted or renamed would otherwise stay online.
+    """
+    removed: List[Path] = []
+    for path in DOCS_OUT_DIR.rglob("*.html"):
+        if path in keep or not path.is_file():
+            continue
+        path.unlink()
+        for variant in COMPRESSED_VARIANTS:
+            path.with_name(path.name + variant).unlink(missing_ok=True)
+        removed.append(path)
+    for folder in {p.parent for p in removed}:
+        while folder != DOCS_OUT_DIR and folder.is_dir() and not any(folder.iterdir()):
+            folder.rmdir()
+            folder = folder.parent
+    return removed
+
+
+SIDEBAR_OPEN = '<aside class="docs-sidebar">'
+SIDEBAR_CLOSE = "</aside>"
+# The style markup sits between these two template lines
+STYLES_OPEN = '<meta name="description" content="AXL DB Documentation" />\n  '
+STYLES_CLOSE = '\n  <link rel="icon"'
+
+
+def _splice(text: str, open_marker: str, close_marker: str, inner: str) -> Optional[str]:
+    start = text.find(open_marker)
+    if start < 0:
+        return None
+    start += len(open_marker)
+    end = text.find(close_marker, start)
+    if end < 0:
+        return None
+    return text[:start] + inner + text[end:]
+
+
+def refresh_page(path: Path, base_prefix: str, sidebar_html: Optional[str] = None, styles: Optional[str] = None) -> bool:
+    """Swap the sidebar and/or style markup of an already built page.
+
+    The Markdown is not re-converted. Returns False if the page is missing
+    or does not look like one of ours, in which case the caller should fall
+    back to a full render.
+    """
+    try:
+        original = path.read_text(encoding="utf-8")
+    except OSError:
+        return False
+    text: Optional[str] = original
+    if styles is not None:
+        text = _splice(text, STYLES_OPEN, STYLES_CLOSE, _rebase_links(styles, base_prefix))
+    if sidebar_html is not None and text is not None:
+        text = _splice(text, SIDEBAR_OPEN, SIDEBAR_CLOSE, sidebar_html)
+    if text is None:
+        return False
+    if text != original:
+        write_file(path, text)
+    return True
+
+
+class BuildProfile:
+    """Where a build's time goes, for --profile.
+
+    build_all() calls lap() at each phase boundary, charging the wall and
+    CPU time since the previous lap to that phase; phases hit more than
+    once (such as patching pages in between planning others) accumulate.
+    Rendered pages are recorded with their per-step timings.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, List[float]] = {}  # name -> [wall, cpu], in first-seen order
+        self.pages: List[Tuple[DocPage, RenderResult]] = []
+        self.start()
+
+    def start(self) -> None:
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def lap(self, phase: str, min_cpu: float = 0.0) -> None:
+        """Charge the time since the last lap to `phase`.
+
+        `min_cpu` covers work done in other processes: the render phase
+        passes its workers' summed CPU time.
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        totals = self.phases.setdefault(phase, [0.0, 0.0])
+        totals[0] += wall - self._wall
+        totals[1] += max(cpu - self._cpu, min_cpu)
+        self._wall, self._cpu = wall, cpu
+
+    def report(self, top: int = 10) -> Dict[str, object]:
+        """The profile as JSON-ready data; `slowest` holds the `top` slowest pages."""
+        rows = []
+        for page, result in self.pages:
+            try:
+                html_bytes = page.output_path.stat().st_size
+            except OSError:
+                html_bytes = 0
+            row: Dict[str, object] = {"url": page.url_path, "source_bytes": page.size, "html_bytes": html_bytes,
+                                      "seconds": round(sum(result.steps.values()), 6), "cpu": round(result.cpu, 6)}
+            row.update((step, round(result.steps[step], 6)) for step in RENDER_STEPS)
+            rows.append(row)
+        phases = {name: {"wall": round(wall, 6), "cpu": round(cpu, 6)} for name, (wall, cpu) in self.phases.items()}
+        return {
+            "version": 1,
+            "phases": phases,
+            "total": {"wall": round(sum(w for w, _ in self.phases.values()), 6),
+                      "cpu": round(sum(c for _, c in self.phases.values()), 6)},
+            "render_steps": {step: round(sum(r.steps[step] for _, r in self.pages), 6) for step in RENDER_STEPS},
+            "slowest": sorted(rows, key=lambda r: r["seconds"], reverse=True)[:top],
+            "pages": sorted(rows, key=lambda r: r["url"]),
+        }
+
+
+def print_profile(report: Dict[str, object]) -> None:
+    print("⏱️  Build profile (wall / CPU seconds):")
+    for name, t in report["phases"].items():
+        print(f"   {name:<12} {t['wall']:8.3f} / {t['cpu']:8.3f}")
+    total = report["total"]
+    print(f"   {'total':<12} {total['wall']:8.3f} / {total['cpu']:8.3f}")
+    pages = report["pages"]
+    if not pages:
+        return
+    steps = ", ".join(f"{step} {seconds:.3f}s" for step, seconds in report["render_steps"].items())
+    print(f"   Rendering {len(pages)} page(s), summed per step: {steps}")
+    print(f"   Slowest {len(report['slowest'])} page(s):")
+    for row in report["slowest"]:
+        print(f"   {row['seconds']:8.3f}s  convert {row['convert']:.3f}s  "
+              f"{row['source_bytes'] / 1024:7.1f} KB md -> {row['html_bytes'] / 1024:7.1f} KB html  {row['url']}")
+
+
+@dataclass
+class RenderJob:
+    """Everything a worker needs to render and write one page."""
+    md_text: str
+    source_hash: str
+    output_path: Path
+    url_path: str
+    title: str
+    base_prefix: str
+
+
+# Below this many pages per worker, process start-up costs more than it saves.
+MIN_BATCH_SIZE = 8
+
+# Per-process render state, set up once per worker by _init_renderer().
+_render_styles = ""
+_render_sidebars: Optional[SidebarRenderer] = None
+_render_search = False
+
+# Steps of rendering one page, timed separately for --profile
+RENDER_STEPS = ("convert", "sidebar", "template", "write", "index", "links")
+
+
+@dataclass
+class RenderResult:
+    output_path: Path
+    changed: bool  # False if the page came out byte-identical to the file already there
+    cpu: float  # CPU seconds for the whole page
+    steps: Dict[str, float]  # wall seconds per RENDER_STEPS entry
+    search_doc: Optional[Dict[str, object]] = None
+    highlights: Dict[str, str] = field(default_factory=dict)  # code blocks new to the highlight cache
+    digest: str = ""  # sha256 of the page as written
+    links: List[str] = field(default_factory=list)  # see page_links()
+    ids: List[str] = field(default_factory=list)
+
+
+def _init_renderer(styles: str, sidebars: SidebarRenderer, search: bool = False) -> None:
+    global _render_styles, _render_sidebars, _render_search
+    _render_styles = styles
+    _render_sidebars = sidebars
+    _render_search = search
+    markdown_converter()  # build it now rather than inside the first page's timing
+
+
+def _render_batch(jobs: List[RenderJob]) -> List[RenderResult]:
+    """Render and write a batch of pages, indexing them for search if enabled."""
+    assert _render_sidebars is not None, "_init_renderer() was not called"
+    done: List[RenderResult] = []
+    clock = time.perf_counter
+    for job in jobs:
+        cpu0 = time.process_time()
+        t0 = clock()
+        html_content = convert_markdown_cached(job.md_text, job.source_hash)
+        t1 = clock()
+        sidebar = _render_sidebars.render(job.url_path)
+        t2 = clock()
+        full_html = render_template(_render_styles, sidebar, html_content, job.title, job.base_prefix)
+        t3 = clock()
+        changed = write_if_changed(job.output_path, full_html)
+        t4 = clock()
+        doc = index_page(html_content) if _render_search else None
+        t5 = clock()
+        links, ids = page_links(html_content)
+        t6 = clock()
+        steps = {"convert": t1 - t0, "sidebar": t2 - t1, "template": t3 - t2, "write": t4 - t3, "index": t5 - t4,
+                 "links": t6 - t5}
+        done.append(RenderResult(job.output_path, changed, time.process_time() - cpu0, steps, doc,
+                                 take_new_highlights(), _output_hashes.pop(job.output_path, ""), links, ids))
+    return done
+
+
+def render_pages(jobs: List[RenderJob], styles: str, sidebars: SidebarRenderer, workers: int,
+                 search: bool = False) -> List[RenderResult]:
+    """Render `jobs`, spread over up to `workers` processes.
+
+    Pages are sent in batches so pickling stays per-batch rather than
+    per-page; the styles and nav tree go to each worker once, at start-up,
+    and each worker builds its Markdown converter once.
+    Results come back in job order, and the output does not depend on the
+    number of workers.
+    """
+    workers = min(workers, len(jobs) // MIN_BATCH_SIZE)
+    if workers <= 1:
+        _init_renderer(styles, sidebars, search)
+        return _render_batch(jobs)
+    batch_size = max(MIN_BATCH_SIZE, -(-len(jobs) // (workers * 4)))
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_renderer,
+                             initargs=(styles, sidebars, search)) as pool:
+        results = [item for batch in pool.map(_render_batch, batches) for item in batch]
+    wall = time.perf_counter() - t0
+    # Summed worker CPU time over wall time: an estimate of the parallelism
+    # achieved, not a measured comparison with a serial run.
+    busy = sum(result.cpu for result in results)
+    print(f"⚡ Rendered {len(jobs)} page(s) on {workers} workers in {wall:.2f}s (est. parallelism {busy / wall:.1f}x)")
+    return results
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def load_manifest() -> Tuple[Dict[str, Dict[str, object]], Dict[str, List[object]]]:
+    """Per-page build keys and the output list (see scan_outputs()) of the previous build.
+
+    Both are keyed by URL path. A missing, unreadable or outdated manifest
+    yields empty mappings, which simply means every page gets rebuilt.
+    """
+    try:
+        data = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}, {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}, {}
+    pages, outputs = data.get("pages"), data.get("outputs")
+    return pages if isinstance(pages, dict) else {}, outputs if isinstance(outputs, dict) else {}
+
+
+def save_manifest(entries: Dict[str, Dict[str, object]], outputs: Optional[Dict[str, List[object]]] = None) -> None:
+    data = {"version": MANIFEST_VERSION, "pages": entries, "outputs": outputs or {}}
+    write_file(MANIFEST_PATH, json.dumps(data, indent=1, sort_keys=True) + "\n")
+
+
+# --- Search index --------------------------------------------------------
+#
+# site/docs/search/ holds a static inverted index that search.js queries
+# in the browser:
+#   meta.json       page count, chunk size and the list of term shards
+#   t-<key>.json    terms starting with <key>: {term: [[page id, weight, positions...], ...]}
+#   p-<n>.json      pages n*SEARCH_CHUNK_PAGES...: [url, title, [[heading id, text, position], ...]]
+# Shard keys are a term's first two characters, or a longer prefix where a
+# shard would outgrow SEARCH_SHARD_BYTES (see _shard_layout()); a term is in
+# the shard of the longest key it starts with. The browser fetches meta.json
+# on first use, then only the typed terms' shards and the page chunks of
+# the top results.
+# Page ids are kept stable between builds, so an edit rewrites only the
+# shards and chunk it touches.
+
+SEARCH_DIR = DOCS_OUT_DIR / "search"
+SEARCH_CACHE_PATH = BUILD_CACHE_DIR / "search-cache.json"
+SEARCH_INDEX_VERSION = 2
+SEARCH_CHUNK_PAGES = 256
+# Shards above this size are split by a longer prefix
+SEARCH_SHARD_BYTES = 16 * 1024
+# Carried with the style markup, like LIVE_RELOAD_SNIPPET, so only builds
+# with an index link it; written for a page in docs/.
+SEARCH_SNIPPET = '<script src="../docs/search/search.js" defer></script>'
+# Size bounds: per page, the highest-weighted terms and their first
+# positions; per term, its highest-weighted pages.
+SEARCH_MAX_TERMS = 2000
+SEARCH_MAX_POSITIONS = 8
+SEARCH_MAX_POSTINGS = 500
+SEARCH_MAX_HEADINGS = 100
+SEARCH_HEADING_BOOST = 5
+SEARCH_STOP_WORDS = frozenset(
+    "an and are as at be by for from has if in is it its of on or that the this to was with".split()
+)
+_SEARCH_WORD_RE = re.compile(r"[a-z0-9_]+")
+_HEADING_TAG_RE = re.compile(r'<h([1-6])\b[^>]*\bid="([^"]*)"[^>]*>(.*?)</h\1>', re.S)
+
+
+def _plain_text(html_text: str) -> str:
+    return html.unescape(_TAG_RE.sub(" ", html_text))
+
+
+def search_terms(text: str) -> List[str]:
+    """Lower-cased words of `text`; search.js tokenizes queries the same way."""
+    return _SEARCH_WORD_RE.findall(text.lower())
+
+
+def index_page(content_html: str) -> Dict[str, object]:
+    """Search data for one converted page: its headings and weighted terms.
+
+    Positions count words from the start of the page. Words in headings
+    weigh SEARCH_HEADING_BOOST times more than body text, and identifiers
+    like axl_fn_3 are also indexed under their parts.
+    """
+    headings: List[List[object]] = []
+    terms: Dict[str, List[int]] = {}
+    position = 0
+
+    def add(text: str, weight: int) -> None:
+        nonlocal position
+        for word in search_terms(text):
+            parts = [word] + word.split("_") if "_" in word else [word]
+            for term in parts:
+                if len(term) < 2 or term in SEARCH_STOP_WORDS:
+                    continue
+                entry = terms.get(term)
+                if entry is None:
+                    terms[term] = [weight, position]
+                else:
+                    entry[0] += weight
+                    if len(entry) <= SEARCH_MAX_POSITIONS and entry[-1] != position:
+                        entry.append(position)
+            position += 1
+
+    pos = 0
+    for m in _HEADING_TAG_RE.finditer(content_html):
+        add(_plain_text(content_html[pos:m.start()]), 1)
+        text = " ".join(_plain_text(m.group(3)).split())
+        if len(headings) < SEARCH_MAX_HEADINGS:
+            headings.append([m.group(2), text, position])
+        add(text, SEARCH_HEADING_BOOST)
+        pos = m.end()
+    add(_plain_text(content_html[pos:]), 1)
+    if len(terms) > SEARCH_MAX_TERMS:
+        kept = sorted(terms, key=lambda t: terms[t][0], reverse=True)[:SEARCH_MAX_TERMS]
+        terms = {t: terms[t] for t in kept}
+    return {"headings": headings, "terms": terms}
+
+
+class SearchIndex:
+    """The inverted index behind site/docs/search/, kept between builds.
+
+    SEARCH_CACHE_PATH stores every page's search data and the full
+    postings, so a build only updates the pages whose source changed and
+    rewrites the shards and page chunks those updates touched.
+    """
+
+    def __init__(self, renderer: str, data: Optional[Dict[str, object]] = None) -> None:
+        data = data or {}
+        self.renderer = renderer
+        self.ids: Dict[str, int] = data.get("ids", {})
+        self.pages: Dict[str, Dict[str, object]] = data.get("pages", {})
+        self.postings: Dict[str, Dict[str, List[int]]] = data.get("postings", {})
+        self.shards: Dict[str, List[str]] = data.get("shards", {})  # two-character root -> shard keys
+        used = set(self.ids.values())
+        self.free = sorted(set(range(max(used, default=-1) + 1)) - used, reverse=True)
+        self.touched_shards: Set[str] = set()
+        self.touched_chunks: Set[int] = set()
+        self.rebuild = self.dirty = not data
+
+    @classmethod
+    def load(cls, renderer: str) -> "SearchIndex":
+        """The cached index, or an empty one if missing, outdated or built by another renderer."""
+        try:
+            data = json.loads(SEARCH_CACHE_PATH.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = None
+        if (not isinstance(data, dict) or data.get("version") != SEARCH_INDEX_VERSION
+                or data.get("renderer") != renderer or not (SEARCH_DIR / "meta.json").exists()):
+            data = None
+        return cls(renderer, data)
+
+    def is_current(self, url_path: str, source_hash: str, title: str) -> bool:
+        page = self.pages.get(url_path)
+        return page is not None and page["source"] == source_hash and page["title"] == title
+
+    def _drop_postings(self, url_path: str) -> None:
+        page = self.pages.get(url_path)
+        if page is None:
+            return
+        page_id = str(self.ids[url_path])
+        for term in page["terms"]:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(page_id, None)
+                if not postings:
+                    del self.postings[term]
+            self.touched_shards.add(term[:2])
+
+    def update(self, url_path: str, source_hash: str, title: str, doc: Dict[str, object]) -> None:
+        """Replace the page's search data with `doc` from index_page()."""
+        self._drop_postings(url_path)
+        if url_path not in self.ids:
+            self.ids[url_path] = self.free.pop() if self.free else len(self.ids)
+        page_id = self.ids[url_path]
+        terms: Dict[str, List[int]] = doc["terms"]  # type: ignore[assignment]
+        for term, entry in terms.items():
+            self.postings.setdefault(term, {})[str(page_id)] = entry
+            self.touched_shards.add(term[:2])
+        self.pages[url_path] = {"source": source_hash, "title": title,
+                                "headings": doc["headings"], "terms": sorted(terms)}
+        self.touched_chunks.add(page_id // SEARCH_CHUNK_PAGES)
+        self.dirty = True
+
+    def retain(self, url_paths: Set[str]) -> None:
+        """Forget pages that are no longer part of the site."""
+        for url_path in [u for u in self.pages if u not in url_paths]:
+            self._drop_postings(url_path)
+            page_id = self.ids.pop(url_path)
+            del self.pages[url_path]
+            self.free.append(page_id)
+            self.free.sort(reverse=True)
+            self.touched_chunks.add(page_id // SEARCH_CHUNK_PAGES)
+            self.dirty = True
+
+    def _term_json(self, term: str) -> str:
+        """The `"term":[[page id, weight, positions...], ...]` member of a shard."""
+        postings = sorted(self.postings[term].items(), key=lambda item: (-item[1][0], int(item[0])))
+        rows = [[int(page_id)] + entry for page_id, entry in postings[:SEARCH_MAX_POSTINGS]]
+        return json.dumps(term) + ":" + json.dumps(rows, separators=(",", ":"))
+
+    @staticmethod
+    def _shard_layout(root: str, members: Dict[str, str]) -> Dict[str, List[str]]:
+        """Split the terms under `root` (term -> member JSON) into shards of about SEARCH_SHARD_BYTES.
+
+        An oversized shard keeps the terms equal to its key, then takes
+        back whole one-character-longer groups, smallest first, while it
+        stays under the cap; the other groups get their own keys and are
+        split the same way. Returns {key: sorted terms}.
+        """
+        layout: Dict[str, List[str]] = {}
+        pending = [(root, sorted(members))]
+        while pending:
+            key, terms = pending.pop()
+            size = sum(len(members[t]) + 1 for t in terms)
+            if size <= SEARCH_SHARD_BYTES:
+                layout[key] = terms
+                continue
+            kept = [t for t in terms if len(t) == len(key)]
+            groups: Dict[str, List[str]] = {}
+            for t in terms:
+                if len(t) > len(key):
+                    groups.setdefault(t[:len(key) + 1], []).append(t)
+            size = sum(len(members[t]) + 1 for t in kept)
+            for child, child_terms in sorted(groups.items(), key=lambda g: sum(len(members[t]) for t in g[1])):
+                child_size = sum(len(members[t]) + 1 for t in child_terms)
+                if size + child_size <= SEARCH_SHARD_BYTES:
+                    kept.extend(child_terms)
+                    size += child_size
+                else:
+                    pending.append((child, child_terms))
+            if kept:
+                layout[key] = sorted(kept)
+        return layout
+
+    def _chunk(self, chunk: int, by_id: Dict[int, str]) -> str:
+        rows: List[Optional[List[object]]] = []
+        for page_id in range(chunk * SEARCH_CHUNK_PAGES, (chunk + 1) * SEARCH_CHUNK_PAGES):
+            url = by_id.get(page_id)
+            page = self.pages[url] if url else None
+            rows.append([url, page["title"], page["headings"]] if page else None)
+        while rows and rows[-1] is None:
+            rows.pop()
+        return json.dumps(rows, separators=(",", ":"), ensure_ascii=False)
+
+    def write(self) -> List[Path]:
+        """Write meta.json, search.js and the shards and chunks touched since the last write.
+
+        A fresh index (no usable cache) rewrites everything and removes
+        stale files. Files whose content did not change are left alone.
+        """
+        if not self.dirty:
+            return []
+        full = self.rebuild
+        by_root: Dict[str, List[str]] = {}
+        for term in self.postings:
+            by_root.setdefault(term[:2], []).append(term)
+        by_id = {page_id: url for url, page_id in self.ids.items()}
+        chunks = range(-(-(max(by_id, default=-1) + 1) // SEARCH_CHUNK_PAGES))
+        written: List[Path] = []
+        if full:
+            self.shards = {}
+        for root in sorted(set(by_root) if full else self.touched_shards):
+            members = {term: self._term_json(term) for term in by_root.get(root, [])}
+            layout = self._shard_layout(root, members) if members else {}
+            for key, terms in layout.items():
+                path = SEARCH_DIR / f"t-{key}.json"
+                if write_if_changed(path, "{" + ",".join(members[t] for t in terms) + "}"):
+                    written.append(path)
+            for key in set(self.shards.pop(root, [])) - set(layout):
+                for path in SEARCH_DIR.glob(f"t-{key}.json*"):
+                    path.unlink()
+            if layout:
+                self.shards[root] = sorted(layout)
+        for chunk in chunks:
+            if full or chunk in self.touched_chunks:
+                path = SEARCH_DIR / f"p-{chunk}.json"
+                if write_if_changed(path, self._chunk(chunk, by_id)):
+                    written.append(path)
+        meta = {"version": SEARCH_INDEX_VERSION, "pages": len(self.pages), "chunk": SEARCH_CHUNK_PAGES,
+                "shards": sorted(key for keys in self.shards.values() for key in keys)}
+        for path, text in ((SEARCH_DIR / "meta.json", json.dumps(meta, separators=(",", ":"))),
+                           (SEARCH_DIR / "search.js", SEARCH_JS)):
+            if write_if_changed(path, text):
+                written.append(path)
+        if full:
+            keep = ({f"t-{key}.json" for keys in self.shards.values() for key in keys}
+                    | {f"p-{chunk}.json" for chunk in chunks} | {"meta.json"})
+            for old in SEARCH_DIR.glob("*.json*"):
+                if old.name.split(".json")[0] + ".json" not in keep:
+                    old.unlink()
+        self.touched_shards.clear()
+        self.touched_chunks.clear()
+        self.rebuild = False
+        return written
+
+    def save(self) -> None:
+        data = {"version": SEARCH_INDEX_VERSION, "renderer": self.renderer,
+                "ids": self.ids, "pages": self.pages, "postings": self.postings, "shards": self.shards}
+        write_file(SEARCH_CACHE_PATH, json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+        self.dirty = False
+
+
+def remove_search_index() -> None:
+    """Delete the search index, for builds run with --no-search."""
+    if SEARCH_DIR.exists():
+        for path in SEARCH_DIR.iterdir():
+            path.unlink()
+        SEARCH_DIR.rmdir()
+    if SEARCH_CACHE_PATH.exists():
+        SEARCH_CACHE_PATH.unlink()
+
+
+# Written to site/docs/search/search.js; see SearchIndex for the file layout.
+SEARCH_JS = r"""// Client side of the docs search index written by build_docs.py.
+(function(){
+  var form = document.querySelector('.docs-search');
+  if(!form || !window.fetch) return;
+  var input = form.querySelector('input');
+  var list = form.querySelector('.docs-search-results');
+  var base = new URL('.', document.currentScript.src);
+  var files = {};
+  var MAX_RESULTS = 10, MAX_EXPANSIONS = 30;
+
+  function load(name){
+    if(!files[name]){
+      files[name] = fetch(new URL(name, base)).then(function(r){
+        if(!r.ok) throw new Error(name + ': ' + r.status);
+        return r.json();
+      });
+    }
+    return files[name];
+  }
+  function words(text){
+    return (text.toLowerCase().match(/[a-z0-9_]+/g) || []).filter(function(w){ return w.length > 1; });
+  }
+  // The shard holding `word`: the longest key it starts with
+  function shardKey(meta, word){
+    var key = null;
+    meta.shards.forEach(function(k){
+      if(word.lastIndexOf(k, 0) === 0 && (key === null || k.length > key.length)) key = k;
+    });
+    return key;
+  }
+  // Postings for one query word, keyed by page id: [weight, positions...].
+  // The last word of the query also matches as a prefix, among the terms
+  // of its shard (longer terms split off into their own shards need more
+  // of the word typed).
+  function lookup(meta, word, prefix){
+    var key = shardKey(meta, word);
+    if(key === null) return Promise.resolve({});
+    return load('t-' + key + '.json').then(function(shard){
+      var found = {}, n = 0;
+      var names = prefix ? Object.keys(shard).filter(function(t){ return t.lastIndexOf(word, 0) === 0; }) : [word];
+      names.sort(function(a, b){ return a.length - b.length; });
+      names.forEach(function(term){
+        if(n++ >= MAX_EXPANSIONS || !shard[term]) return;
+        var idf = Math.log(1 + meta.pages / shard[term].length);
+        var exact = term === word ? 1 : 0.5;
+        shard[term].forEach(function(p){
+          var score = Math.log(1 + p[1]) * idf * exact;
+          var best = found[p[0]];
+          if(!best || best.score < score) found[p[0]] = {score: score, positions: p.slice(2)};
+        });
+      });
+      return found;
+    });
+  }
+  function search(query){
+    var ws = words(query);
+    if(!ws.length) return Promise.resolve([]);
+    return load('meta.json').then(function(meta){
+      return Promise.all(ws.map(function(w, i){ return lookup(meta, w, i === ws.length - 1); })).then(function(hits){
+        var results = [];
+        Object.keys(hits[0]).forEach(function(id){
+          var score = 0;
+          for(var i = 0; i < hits.length; i++){
+            var hit = hits[i][id];
+            if(!hit) return;
+            score += hit.score;
+            // Adjacent words in query order score as a phrase
+            if(i > 0 && hit.positions.some(function(p){ return hits[i - 1][id].positions.indexOf(p - 1) >= 0; })) score += 1;
+          }
+          results.push({id: +id, score: score, position: hits[0][id].positions[0]});
+        });
+        results.sort(function(a, b){ return b.score - a.score || a.id - b.id; });
+        results = results.slice(0, MAX_RESULTS);
+        var chunks = {};
+        results.forEach(function(r){ chunks[Math.floor(r.id / meta.chunk)] = 1; });
+        return Promise.all(Object.keys(chunks).map(function(c){ return load('p-' + c + '.json'); })).then(function(){
+          return Promise.all(results.map(function(r){
+            return load('p-' + Math.floor(r.id / meta.chunk) + '.json').then(function(rows){
+              var page = rows[r.id % meta.chunk];
+              if(!page) return null;
+              var heading = null;
+              page[2].forEach(function(h){ if(h[2] <= r.position) heading = h; });
+              return {url: page[0], title: page[1], heading: heading};
+            });
+          }));
+        });
+      });
+    });
+  }
+  function href(result){
+    var url = new URL('../' + result.url.replace(/^\/docs\//, ''), base).href;
+    return result.heading && result.heading[2] > 0 ? url + '#' + result.heading[0] : url;
+  }
+  function show(results){
+    list.textContent = '';
+    results.filter(Boolean).forEach(function(r){
+      var li = document.createElement('li');
+      var a = document.createElement('a');
+      a.href = href(r);
+      a.textContent = r.title;
+      if(r.heading && r.heading[1] !== r.title){
+        var small = document.createElement('small');
+        small.textContent = r.heading[1];
+        a.appendChild(small);
+      }
+      li.appendChild(a);
+      list.appendChild(li);
+    });
+    if(!list.children.length && input.value.trim()){
+      var empty = document.createElement('li');
+      empty.textContent = 'No results';
+      list.appendChild(empty);
+    }
+    list.hidden = !input.value.trim();
+  }
+  var timer = 0, latest = 0;
+  input.addEventListener('input', function(){
+    clearTimeout(timer);
+    timer = setTimeout(function(){
+      var ticket = ++latest;
+      search(input.value).then(function(results){ if(ticket === latest) show(results); }, function(){ list.hidden = true; });
+    }, 60);
+  });
+  input.addEventListener('keydown', function(e){
+    if(e.key === 'Escape'){ input.value = ''; list.hidden = true; }
+  });
+  form.addEventListener('submit', function(e){
+    e.preventDefault();
+    var first = list.querySelector('a');
+    if(first) location.href = first.href;
+  });
+  document.addEventListener('click', function(e){ if(!form.contains(e.target)) list.hidden = true; });
+  input.addEventListener('focus', function(){ load('meta.json').catch(function(){}); if(list.children.length) list.hidden = false; });
+  form.hidden = false;
+})();
+"""
+
+
+# --- Link graph, sitemap and asset manifest -------------------------------
+#
+# Once the pages are written, build_all() checks every internal link against
+# the pages, their element ids and the other outputs, then writes
+# sitemap.xml and asset-manifest.json. It works only from what the build
+# holds in memory: a page's links and ids come from its render, or from the
+# manifest if it was not re-rendered, and output hashes from the writes
+# themselves, or from the manifest for files left untouched. No output is
+# read back.
+
+SITEMAP_PATH = DOCS_OUT_DIR / "sitemap.xml"
+SITEMAP_MAX_URLS = 50000  # per file, by the sitemap protocol
+ASSET_MANIFEST_PATH = DOCS_OUT_DIR / "asset-manifest.json"
+ASSET_MANIFEST_VERSION = 1
+# Broken links listed in the build output; the rest are only counted
+LINK_REPORT_LIMIT = 20
+
+_LINK_ATTR_RE = re.compile(r'(?<![\w-])(?:href|src)\s*=\s*"([^"]*)"')
+_ID_ATTR_RE = re.compile(r'(?<![\w-])id\s*=\s*"([^"]+)"')
+_URL_SCHEME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+_SCRIPT_BODY_RE = re.compile(r"(<script\b[^>]*>).*?</script>", re.S | re.I)
+
+
+class BrokenLinksError(RuntimeError):
+    """Raised by build_all(strict_links=True) after a build that has broken internal links."""
+
+
+def page_links(content_html: str) -> Tuple[List[str], List[str]]:
+    """Internal link targets (as written, deduplicated) and element ids of converted HTML.
+
+    Links with a scheme (https:, mailto:) or to another host are left out,
+    and so is markup built by inline scripts.
+    """
+    content_html = _SCRIPT_BODY_RE.sub(r"\1</script>", content_html)
+    links = {html.unescape(href) for href in _LINK_ATTR_RE.findall(content_html)}
+    internal = sorted(href for href in links if href and not href.startswith("//") and not _URL_SCHEME_RE.match(href))
+    return internal, sorted({html.unescape(i) for i in _ID_ATTR_RE.findall(content_html)})
+
+
+def resolve_link(base_url: str, href: str) -> Tuple[str, str]:
+    """Site path ("/docs/a.html") and fragment that `href` points at from the page at `base_url`."""
+    target, _, fragment = urllib.parse.urljoin(base_url, href).partition("#")
+    path = urllib.parse.unquote(target.partition("?")[0])
+    if path.endswith("/"):
+        path += "index.html"
+    return path, urllib.parse.unquote(fragment)
+
+
+def check_links(sources: Iterable[Tuple[str, str, List[str]]], page_ids: Dict[str, Set[str]],
+                outputs: Set[str]) -> Tuple[int, List[Tuple[str, str, str]]]:
+    """Check each (label, base URL, links) of `sources`; returns the link count and broken ones.
+
+    A link to a page (a key of `page_ids`) must name one of its ids, if it
+    has a fragment. A link to anything else must hit a path in `outputs`
+    or a file under site/ (such as site/index.html), checked with one
+    stat() per distinct path. Broken links come back as (label, href,
+    reason).
+    """
+    found: Dict[str, bool] = {}
+    broken: List[Tuple[str, str, str]] = []
+    count = 0
+    for label, base_url, links in sources:
+        for href in links:
+            count += 1
+            path, fragment = resolve_link(base_url, href)
+            ids = page_ids.get(path)
+            if ids is None:
+                if path not in found:
+                    found[path] = path in outputs or (SITE_DIR / path.lstrip("/")).is_file()
+                if not found[path]:
+                    broken.append((label, href, "no such page or file"))
+            elif fragment and fragment not in ids:
+                broken.append((label, href, f"no id {fragment!r} on {path}"))
+    return count, broken
+
+
+def sitemap_xml(pages: List[DocPage], site_url: str) -> str:
+    """sitemap.xml for `pages`, with their URLs under `site_url` and source mtimes as lastmod."""
+    base = site_url.rstrip("/")
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for page in pages[:SITEMAP_MAX_URLS]:
+        url = page.url_path[:-len("index.html")] if page.url_path.endswith("/index.html") else page.url_path
+        lastmod = time.strftime("%Y-%m-%d", time.gmtime(page.mtime_ns // 1_000_000_000))
+        lines.append(f"  <url><loc>{html.escape(base + urllib.parse.quote(url))}</loc><lastmod>{lastmod}</lastmod></url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def _walk_outputs(folder: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    """(path, stat) of the files below `folder`, skipping dotfiles and precompressed variants."""
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.name.startswith(".") or entry.name.endswith(COMPRESSED_VARIANTS):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_outputs(Path(entry.path))
+            elif entry.is_file():
+                yield Path(entry.path), entry.stat()
+
+
+def scan_outputs(previous: Dict[str, List[object]]) -> Dict[str, List[object]]:
+    """[size, mtime_ns, sha256] of every output under site/docs/, keyed by URL path.
+
+    The hash is the one recorded when the file was written this build, or
+    the one in `previous` if the size and mtime still match; only a file
+    with neither (an output from before the manifest recorded hashes) is
+    read. The asset manifest itself is left out.
+    """
+    outputs: Dict[str, List[object]] = {}
+    for path, st in _walk_outputs(DOCS_OUT_DIR):
+        if path == ASSET_MANIFEST_PATH:
+            continue
+        url = "/" + path.relative_to(SITE_DIR).as_posix()
+        digest = _output_hashes.get(path)
+        if digest is None:
+            old = previous.get(url)
+            if isinstance(old, list) and len(old) == 3 and old[:2] == [st.st_size, st.st_mtime_ns]:
+                digest = old[2]
+            else:
+                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        outputs[url] = [st.st_size, st.st_mtime_ns, digest]
+    return outputs
+
+
+def asset_manifest(outputs: Dict[str, List[object]]) -> str:
+    """asset-manifest.json: the size and sha256 of every output, e.g. for deploy checks or CDN purges."""
+    files = {url: {"size": size, "sha256": digest} for url, (size, _, digest) in sorted(outputs.items())}
+    return json.dumps({"version": ASSET_MANIFEST_VERSION, "files": files}, indent=1) + "\n"
+
+
+BUILD_KEYS = ("source", "css", "template", "nav")
+
+
+def build_all(force: bool = False, jobs: Optional[int] = None, changed: Optional[Set[Path]] = None,
+              css_mode: str = "inline", critical: bool = False, search: bool = True,
+              live_reload: bool = False, nav_mode: str = "full", site_url: Optional[str] = None,
+              strict_links: bool = False, profile: Optional[BuildProfile] = None) -> List[Path]:
+    """Build every page, skipping those whose inputs match the manifest.
+
+    A page's build key is the hash of its Markdown source, of its style
+    markup (see build_styles()), the signature of its sidebar, plus the template version and renderer. When
+    only the sidebar or the CSS changed (a page was added, removed or
+    retitled; site/index.html was edited), the existing output is patched
+    instead of being re-converted. The remaining pages are rendered on
+    `jobs` processes (default: CPU count).
+
+    `changed` is the exact set of source files and folders known to have
+    changed since the last build (from the watcher); every other page is
+    trusted to match its manifest entry and is not read at all.
+
+    With `search`, the search index (see SearchIndex) is updated for the
+    pages whose source changed since it was last written. Pages link the
+    vendored assets of build_vendor_assets(), whose Font Awesome subset
+    covers the icons each page's Markdown names (kept in the manifest). With
+    `live_reload`, pages include LIVE_RELOAD_SNIPPET, and with `search`,
+    SEARCH_SNIPPET. With `nav_mode`
+    "lazy", pages carry only their part of the sidebar and the whole tree
+    goes to NAV_JSON_PATH (see LazySidebarRenderer).
+
+    Finally every internal link and #anchor is checked against the build
+    (see check_links()), and the asset manifest is written, plus
+    sitemap.xml if `site_url` is given. With `strict_links`, broken links
+    raise BrokenLinksError once everything is written. Phase and per-page
+    timings go to `profile`, if given.
+    """
+    t0 = time.perf_counter()
+    profile = profile if profile is not None else BuildProfile()
+    profile.start()
+    _output_hashes.clear()
+    for path in LEGACY_CACHE_FILES:
+        path.unlink(missing_ok=True)
     written: List[Path] = []
+    css = read_site_css()
+    stylesheet: Optional[Path] = None
+    if css_mode == "external":
+        stylesheet, created = write_stylesheet(css)
+        if created:
+            written.append(stylesheet)
+    elif css_mode == "inline":
+        remove_stylesheets()
+    else:
+        raise ValueError(f"unknown CSS mode {css_mode!r}, expected one of {CSS_MODES}")
+    styles = build_styles(css, stylesheet, critical)
+    profile.lap("styles")
+    previous, previous_outputs = load_manifest()
+    if force:
+        previous = {}  # output hashes are checked against size and mtime, so they stay usable
+    profile.lap("manifest")
+    pages = discover_docs(previous, changed)
+    profile.lap("discover")
+    page_icons: Dict[str, List[str]] = {}
+    for page in pages:
+        old_icons = previous.get(page.url_path, {}).get("icons")
+        if page.text is None and old_icons is not None:
+            page_icons[page.url_path] = old_icons
+        else:
+            if page.text is None:
+                page.text = page.source_path.read_text(encoding="utf-8")
+            page_icons[page.url_path] = sorted(icon_classes(page.text))
+    vendor, vendor_written = build_vendor_assets(used_icon_classes(i for icons in page_icons.values() for i in icons))
+    written.extend(vendor_written)
+    # Vendor links and the search and live reload scripts are carried with the style
+    # markup, so a new asset hash or toggling search or live reload patches pages in place
+    styles += "\n  " + vendor
+    if search:
+        styles += "\n  " + SEARCH_SNIPPET
+    if live_reload:
+        styles += "\n  " + LIVE_RELOAD_SNIPPET
+    profile.lap("vendor")
     # If no pages, generate a minimal index to avoid broken builds
     if not pages:
         minimal_sidebar = '<nav class="docs-nav" aria-label="Docs"><ul><li><span>No pages</span></li></ul></nav>'
         minimal_content = '<p>Add Markdown files to the <code>docs/</code> folder to populate documentation.</p>'
-        html = render_template(css, minimal_sidebar, minimal_content, "Documentation", base_prefix="..")
-        write_file(DOCS_OUT_DIR / "index.html", html)
+        html = render_template(styles, minimal_sidebar, minimal_content, "Documentation", base_prefix="..")
+        write_if_changed(DOCS_OUT_DIR / "index.html", html)
+        prune_outputs({DOCS_OUT_DIR / "index.html"})
+        save_manifest({})
         return [DOCS_OUT_DIR / "index.html"]
+    entries: Dict[str, Dict[str, object]] = {}
+    css_hash = _hash_text(styles)
+    template_key = f"{TEMPLATE_VERSION}:{renderer_id()}:{highlighter_id()}"
+    if nav_mode == "full":
+        sidebars = SidebarRenderer(build_nav_tree(pages))
+        NAV_JSON_PATH.unlink(missing_ok=True)
+    elif nav_mode == "lazy":
+        sidebars = LazySidebarRenderer(build_nav_tree(pages))
+        if write_if_changed(NAV_JSON_PATH, sidebars.nav_json()):
+            written.append(NAV_JSON_PATH)
+    else:
+        raise ValueError(f"unknown nav mode {nav_mode!r}, expected one of {NAV_MODES}")
+    profile.lap("nav")
+    skipped = refreshed = 0
+    to_render: List[RenderJob] = []
+    to_index: List[Tuple[DocPage, str]] = []
+    search_index: Optional[SearchIndex] = None
+    if search:
+        search_index = SearchIndex(renderer_id()) if force else SearchIndex.load(renderer_id())
+    else:
+        remove_search_index()
+    profile.lap("search")
     for page in pages:
-        md_text = page.source_path.read_text(encoding="utf-8")
-        html_content = convert_markdown(md_text)
-        sidebar = build_sidebar(pages, page)
-        # Compute correct base prefix from this page directory back to site root
-        rel_from_docs = page.output_path.relative_to(DOCS_OUT_DIR)
-        depth_dirs = len(rel_from_docs.parts) - 1  # number of parent directories under docs/
-        if depth_dirs <= 0:
-            base_prefix = ".."
-        else:
-            base_prefix = "/".join([".."] * (depth_dirs + 1))
-        full_html = render_template(css, sidebar, html_content, page.title, base_prefix)
-        write_file(page.output_path, full_html)
-        written.append(page.output_path)
+        old = previous.get(page.url_path, {})
+        source_hash = old["source"] if page.text is None else _hash_text(page.text)
+        base_prefix = _base_prefix(page)
+        entry = {
+            "source": source_hash,
+            "css": css_hash,
+            "template": template_key,
+            "nav": sidebars.signature(page.url_path),
+            "title": page.title,
+            "size": page.size,
+            "mtime": page.mtime_ns,
+            "icons": page_icons[page.url_path],
+            "links": old.get("links", []),
+            "ids": old.get("ids", []),
+        }
+        entries[page.url_path] = entry
+        stale = [k for k in BUILD_KEYS if old.get(k) != entry[k]]
+        if search_index is not None and not search_index.is_current(page.url_path, source_hash, page.title):
+            to_index.append((page, source_hash))
+        if not stale and page.output_path.exists():
+            skipped += 1
+            continue
+        if old and set(stale) <= {"css", "nav"}:
+            profile.lap("plan")
+            sidebar = sidebars.render(page.url_path) if "nav" in stale else None
+            patched = refresh_page(page.output_path, base_prefix, sidebar, styles if "css" in stale else None)
+            profile.lap("patch")
+            if patched:
+                refreshed += 1
+                written.append(page.output_path)
+                continue
+        md_text = page.text if page.text is not None else page.source_path.read_text(encoding="utf-8")
+        to_render.append(RenderJob(md_text, source_hash, page.output_path, page.url_path, page.title, base_prefix))
+    profile.lap("plan")
+    docs: Dict[str, Optional[Dict[str, object]]] = {}
+    highlights: Dict[str, str] = {}
+    identical = 0
+    if to_render:
+        load_highlight_cache()  # before forking, so workers start with it
+        rendered = render_pages(to_render, styles, sidebars, jobs or os.cpu_count() or 1, search_index is not None)
+        profile.lap("render", min_cpu=sum(result.cpu for result in rendered))
+        by_url = {page.url_path: page for page in pages}
+        for job, result in zip(to_render, rendered):
+            if result.changed:
+                written.append(result.output_path)
+            else:
+                identical += 1
+            profile.pages.append((by_url[job.url_path], result))
+            docs[job.url_path] = result.search_doc
+            highlights.update(result.highlights)
+            entries[job.url_path].update(links=result.links, ids=result.ids)
+            _output_hashes[result.output_path] = result.digest
+    if search_index is not None:
+        for page, source_hash in to_index:
+            doc = docs.get(page.url_path)
+            if doc is None:  # unchanged output, but not indexed yet
+                md_text = page.text if page.text is not None else page.source_path.read_text(encoding="utf-8")
+                doc = index_page(convert_markdown_cached(md_text, source_hash))
+            search_index.update(page.url_path, source_hash, page.title, doc)
+        search_index.retain({page.url_path for page in pages})
+        if search_index.dirty:
+            index_files = search_index.write()
+            search_index.save()
+            written.extend(index_files)
+            print(f"🔎 Search index: {len(to_index)} page(s) indexed, {len(index_files)} file(s) updated, "
+                  f"{len(search_index.postings)} terms across {len(search_index.pages)} page(s)")
+        profile.lap("search")
+    save_highlight_cache(highlights)
+    same = f" ({identical} byte-identical, left untouched)" if identical else ""
+    print(f"📄 Pages: {len(to_render)} rebuilt{same}, {refreshed} patched (sidebar/CSS only), {skipped} unchanged (skipped)")
     # Ensure /docs/ loads a valid page. If no docs/index.md exists, redirect to first available page
     index_target = DOCS_OUT_DIR / "index.html"
     has_index = any(p.output_path.name == "index.html" for p in pages)
@@ -455,31 +2634,387 @@ def build_all() -> List[Path]:
         rel = default_page.output_path.relative_to(DOCS_OUT_DIR)
         redirect = f'<!DOCTYPE html><meta http-equiv="refresh" content="0; url=./{rel.as_posix()}">\n<link rel="canonical" href="./{rel.as_posix()}">' \
             if rel.as_posix() != 'index.html' else '<!DOCTYPE html>'
-        write_file(index_target, redirect)
-        written.append(index_target)
+        if write_if_changed(index_target, redirect):
+            written.append(index_target)
+    removed = prune_outputs({p.output_path for p in pages} | {index_target})
+    if removed:
+        print(f"🧹 Removed {len(removed)} page(s) whose Markdown is gone")
+    profile.lap("finish")
+
+    if site_url:
+        if write_if_changed(SITEMAP_PATH, sitemap_xml(pages, site_url)):
+            written.append(SITEMAP_PATH)
+    else:
+        for path in (SITEMAP_PATH, *(SITEMAP_PATH.with_name(SITEMAP_PATH.name + v) for v in COMPRESSED_VARIANTS)):
+            path.unlink(missing_ok=True)
+    outputs = scan_outputs(previous_outputs)
+    # The template's own links (logo, search script, vendor CSS) are the same
+    # on every page, so they are checked once, from docs/index.html
+    template_links, template_ids = page_links(render_template(styles, "", "", "", ".."))
+    page_ids = {page.url_path: set(entries[page.url_path]["ids"]).union(template_ids) for page in pages}
+    sources = [(page.source_path.relative_to(DOCS_SRC_DIR.parent).as_posix(), page.url_path,
+                entries[page.url_path]["links"]) for page in pages]
+    sources.append(("page template", "/docs/index.html", template_links))
+    link_count, broken = check_links(sources, page_ids, set(outputs))
+    if write_if_changed(ASSET_MANIFEST_PATH, asset_manifest(outputs)):
+        written.append(ASSET_MANIFEST_PATH)
+    save_manifest(entries, outputs)
+    sitemap_note = f", {SITEMAP_PATH.name} for {site_url}" if site_url else ""
+    print(f"🔗 Links: {link_count} internal link(s) checked, {len(broken)} broken; "
+          f"{len(outputs)} file(s) in {ASSET_MANIFEST_PATH.name}{sitemap_note}")
+    for label, href, reason in broken[:LINK_REPORT_LIMIT]:
+        print(f"   ❌ {label}: {href} ({reason})")
+    if len(broken) > LINK_REPORT_LIMIT:
+        print(f"   ... and {len(broken) - LINK_REPORT_LIMIT} more")
+    profile.lap("links")
+
+    total = sum(outputs[p.url_path][0] for p in pages)
+    sheet_note = f" + {stylesheet.stat().st_size / 1024:.1f} KB stylesheet" if stylesheet else ""
+    print(f"📦 Output: {total / 1024:.1f} KB of HTML across {len(pages)} page(s){sheet_note} "
+          f"({css_mode} CSS), built in {time.perf_counter() - t0:.2f}s")
+    profile.lap("finish")
+    if broken and strict_links:
+        raise BrokenLinksError(f"{len(broken)} broken internal link(s)")
 
     # No longer generate a root-level docs.html; rely on site/docs/index.html
 
     return written
 
 
-def watch_loop(interval: float = 1.0) -> None:
-    print("👀 Watching for changes in docs/ ... Press Ctrl+C to stop")
-    last_mtime = 0.0
+# server.py serves the variants of the same suffixes (its COMPRESSIBLE_SUFFIXES)
+COMPRESS_SUFFIXES = {".html", ".css", ".svg", ".js", ".json", ".xml"}
+# Below this size the compressed variant is not worth a second file.
+COMPRESS_MIN_BYTES = 1024
+COMPRESSED_VARIANTS = (".gz", ".br")
+
+
+@functools.lru_cache(maxsize=None)
+def import_brotli() -> Optional[object]:
+    try:
+        import brotli  # type: ignore
+        return brotli
+    except Exception:
+        return None
+
+
+def _compress(data: bytes, variant: str) -> Optional[bytes]:
+    if variant == ".gz":
+        # mtime=0 keeps the output deterministic
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    brotli = import_brotli()
+    if brotli is None:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+def _site_assets() -> List[Path]:
+    return [p for p in SITE_DIR.rglob("*")
+            if p.suffix in COMPRESS_SUFFIXES and not p.name.startswith(".") and p.is_file()]
+
+
+def precompress(paths: Optional[List[Path]] = None) -> Tuple[int, int, int]:
+    """Write `.gz`/`.br` siblings for compressible files under site/.
+
+    Checks `paths`, or every text asset under site/ when None. A sibling
+    carries its source's mtime, so it is only rewritten when the source
+    changed. Siblings of files that became too small to qualify, and
+    orphans whose source is gone, are removed on full passes.
+    Returns (files compressed, bytes before, bytes saved by the best variant).
+    """
+    full = paths is None
+    candidates = _site_assets() if paths is None else [p for p in paths if p.suffix in COMPRESS_SUFFIXES]
+    count = before = saved = 0
+    for path in candidates:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        best = st.st_size
+        touched = False
+        for variant in COMPRESSED_VARIANTS:
+            sibling = path.with_name(path.name + variant)
+            if st.st_size < COMPRESS_MIN_BYTES:
+                sibling.unlink(missing_ok=True)
+                continue
+            try:
+                if sibling.stat().st_mtime_ns == st.st_mtime_ns:
+                    continue
+            except OSError:
+                pass
+            data = _compress(path.read_bytes(), variant)
+            if data is None or len(data) >= st.st_size:
+                sibling.unlink(missing_ok=True)
+                continue
+            write_bytes_atomic(sibling, data, st.st_mtime_ns)
+            best = min(best, len(data))
+            touched = True
+        if touched:
+            count += 1
+            before += st.st_size
+            saved += st.st_size - best
+    if full:
+        for variant in COMPRESSED_VARIANTS:
+            for sibling in SITE_DIR.rglob("*" + variant):
+                if not sibling.with_name(sibling.name[:-len(variant)]).exists():
+                    sibling.unlink()
+    if count:
+        print(f"🗜️  Precompressed {count} file(s): {before / 1024:.1f} KB, {saved / 1024:.1f} KB saved")
+    return count, before, saved
+
+
+def _is_changed(path: Path, changed: Set[Path]) -> bool:
+    """True if `path` or any folder above it is in `changed`."""
+    return path in changed or any(parent in changed for parent in path.parents)
+
+
+class PollingWatcher:
+    """Fallback watcher: compares mtimes of docs/**/*.md and site/index.html."""
+
+    kind = "polling"
+
+    def __init__(self, interval: float = 1.0) -> None:
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    @staticmethod
+    def _scan() -> Dict[Path, int]:
+        snapshot = {p: p.stat().st_mtime_ns for p in DOCS_SRC_DIR.rglob("*.md")}
+        if INDEX_HTML.exists():
+            snapshot[INDEX_HTML] = INDEX_HTML.stat().st_mtime_ns
+        return snapshot
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[Path]]:
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = self._scan()
+        old, self._snapshot = self._snapshot, current
+        return {p for p in old.keys() | current.keys() if old.get(p) != current.get(p)}
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify via ctypes: no polling, and reports exactly which paths changed.
+
+    Watches every folder under docs/ (adding new ones as they appear) and
+    site/ for index.html. Raises OSError where inotify is unavailable.
+    """
+
+    kind = "inotify"
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        self._add_watch(SITE_DIR)
+        for folder in [DOCS_SRC_DIR, *(p for p in DOCS_SRC_DIR.rglob("*") if p.is_dir())]:
+            self._add_watch(folder)
+
+    def _add_watch(self, folder: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), self.MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch({folder}): {os.strerror(err)}")
+        self._dirs[wd] = folder
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[Path]]:
+        """Changed paths seen within `timeout`; None means "rescan everything"."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[Path] = set()
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(buf, offset)
+            name = buf[offset + self._EVENT.size:offset + self._EVENT.size + length].rstrip(b"\0")
+            offset += self._EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            folder = self._dirs.get(wd)
+            if mask & self.IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            if folder is None or not name:
+                continue
+            path = folder / os.fsdecode(name)
+            if folder == SITE_DIR:
+                if path == INDEX_HTML:
+                    changed.add(path)
+            elif mask & self.IN_ISDIR:
+                # A folder appearing or moving in brings its whole subtree with it
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    for sub in [path, *(p for p in path.rglob("*") if p.is_dir())]:
+                        self._add_watch(sub)
+                changed.add(path)
+            elif path.suffix == ".md":
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def open_watcher(interval: float = 1.0):
+    """An InotifyWatcher where supported, else a PollingWatcher."""
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError) as e:
+        print(f"ℹ️ inotify unavailable ({e}); falling back to polling every {interval}s")
+        return PollingWatcher(interval)
+
+
+def wait_for_changes(watcher, debounce: float = 0.15) -> Optional[Set[Path]]:
+    """Block until something changes, then gather events until `debounce` seconds pass quietly.
+
+    Editors often save in bursts (write, rename, chmod); they end up in one rebuild.
+    """
+    changed: Optional[Set[Path]] = set()
+    while not changed and changed is not None:
+        changed = watcher.read(None)
     while True:
-        mtimes = [p.stat().st_mtime for p in DOCS_SRC_DIR.rglob("*.md")] + [INDEX_HTML.stat().st_mtime]
-        current = max(mtimes) if mtimes else 0.0
-        if current > last_mtime:
-            written = build_all()
-            print(f"✅ Rebuilt {len(written)} files")
-            last_mtime = current
-        time.sleep(interval)
+        more = watcher.read(debounce)
+        if more is None:
+            return None
+        if not more:
+            return changed
+        if changed is not None:
+            changed |= more
+
+
+# --- Live reload ---------------------------------------------------------
+#
+# With --live-reload, pages carry LIVE_RELOAD_SNIPPET, which listens to
+# server.py's /__livereload event stream and reloads when the page itself
+# or one of its stylesheets is among the changed paths. After each watch
+# rebuild the changed output paths are handed to `notify`: server.py
+# --watch passes its own publisher, otherwise publish_changes() writes them
+# to LIVE_RELOAD_FILE, which a server.py in another process polls.
+
+LIVE_RELOAD_FILE = SITE_DIR / ".livereload.json"
+LIVE_RELOAD_SNIPPET = """<script>
+    (function(){
+      if(!window.EventSource) return;
+      function norm(path){ return path.replace(/\\/$/, '/index.html'); }
+      var events = new EventSource('/__livereload');
+      events.addEventListener('change', function(e){
+        var changed = JSON.parse(e.data);
+        var mine = [norm(location.pathname)];
+        document.querySelectorAll('link[rel=stylesheet], script[src]').forEach(function(el){
+          var url = new URL(el.href || el.src, location.href);
+          if(url.origin === location.origin) mine.push(url.pathname);
+        });
+        if(changed.some(function(path){ return mine.indexOf(path) >= 0; })) location.reload();
+      });
+    })();
+  </script>"""
 
 
-def main() -> None:
+def site_paths(paths: Iterable[Path]) -> List[str]:
+    """URL paths ("/docs/a.html") of the files in `paths` that lie under site/."""
+    urls: List[str] = []
+    for path in paths:
+        try:
+            urls.append("/" + path.relative_to(SITE_DIR).as_posix())
+        except ValueError:
+            continue
+    return sorted(set(urls))
+
+
+def publish_changes(urls: List[str]) -> None:
+    """Hand changed URL paths to a server.py running in another process."""
+    data = {"id": time.time_ns(), "paths": urls}
+    write_file(LIVE_RELOAD_FILE, json.dumps(data))  # atomic, so the server never reads half of it
+
+
+def watch_loop(interval: float = 1.0, jobs: Optional[int] = None, compress: bool = True,
+               notify: Optional[Callable[[List[str]], None]] = None, **build_options) -> None:
+    """Rebuild on every change; with `notify`, pass it the changed URL paths after each build."""
+    watcher = open_watcher(interval)
+    print(f"👀 Watching for changes in docs/ ({watcher.kind}) ... Press Ctrl+C to stop")
+    try:
+        while True:
+            changed = wait_for_changes(watcher)
+            if changed is None:
+                print("🔁 Change queue overflowed; checking every page")
+            else:
+                names = ", ".join(sorted(os.path.relpath(p, ROOT_DIR) for p in changed))
+                print(f"🔁 Changed: {names}")
+            written = build_all(jobs=jobs, changed=changed, **build_options)
+            if compress:
+                precompress(written + [INDEX_HTML] if changed is not None else None)
+            print(f"✅ Rebuilt {len(written)} file(s)")
+            if notify is not None and written:
+                notify(site_paths(written))
+    finally:
+        watcher.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """The command line of build_docs.py; server.py --watch --build-args parses with it too."""
     parser = argparse.ArgumentParser(description="Build AXL DB docs site from Markdown")
     parser.add_argument("--watch", action="store_true", help="Rebuild on changes")
-    args = parser.parse_args()
+    parser.add_argument("--force", action="store_true", help="Ignore the build manifest and rebuild every page")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="Worker processes for page rendering (default: CPU count)")
+    parser.add_argument("--css", choices=CSS_MODES, default="inline", dest="css_mode",
+                        help="Inline the CSS into every page, or link one content-hashed stylesheet (default: inline)")
+    parser.add_argument("--critical-css", action="store_true",
+                        help="With --css external, still inline the above-the-fold rules")
+    parser.add_argument("--compress", action=argparse.BooleanOptionalAction, default=True,
+                        help="Write precompressed .gz/.br siblings of text assets (default: yes)")
+    parser.add_argument("--nav-mode", choices=NAV_MODES, default="full",
+                        help="Inline the whole sidebar into every page, or only the page's path and load "
+                             "the rest from docs/nav.json on demand, for very large trees (default: full)")
+    parser.add_argument("--search", action=argparse.BooleanOptionalAction, default=True,
+                        help="Write the client-side search index to site/docs/search/ (default: yes)")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="Public URL of the site root, e.g. https://example.org; writes docs/sitemap.xml")
+    parser.add_argument("--strict-links", action="store_true",
+                        help="Exit with an error if any internal link or #anchor is broken")
+    parser.add_argument("--fetch-vendor", action="store_true",
+                        help=f"Download the highlight.js theme and JetBrains Mono into {VENDOR_CACHE_DIR.name}/ before building")
+    parser.add_argument("--live-reload", action=argparse.BooleanOptionalAction, default=None,
+                        help="Reload open pages after a watch rebuild; needs server.py (default: on with --watch)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Report wall/CPU time per build phase and the slowest pages")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="Slowest pages to list with --profile (default: 10)")
+    parser.add_argument("--profile-json", type=Path, metavar="PATH",
+                        help="Write the profile as JSON, e.g. for CI to compare between commits (implies --profile)")
+    parser.add_argument("--profile-pstats", type=Path, metavar="PATH",
+                        help="Run the build under cProfile and dump pstats to PATH; page rendering is only "
+                             "included with --jobs 1 (implies --profile)")
+    return parser
+
+
+def build_options(args: argparse.Namespace) -> Dict[str, object]:
+    """The build_all() keyword arguments that shape the output, from parsed build_parser() options."""
+    return {"css_mode": args.css_mode, "critical": args.critical_css, "search": args.search,
+            "nav_mode": args.nav_mode, "site_url": args.site_url}
+
+
+def main() -> None:
+    args = build_parser().parse_args()
 
     if not DOCS_SRC_DIR.exists():
         print("📁 Creating docs/ with a starter index.md ...")
@@ -506,12 +3041,40 @@ int main(void){ return 0; }
 """
         write_file(DOCS_SRC_DIR / "index.md", starter)
 
-    written = build_all()
+    if args.fetch_vendor:
+        fetch_vendor()
+    live_reload = args.watch if args.live_reload is None else args.live_reload
+    profile = BuildProfile() if args.profile or args.profile_json or args.profile_pstats else None
+    profiler = cProfile.Profile() if args.profile_pstats else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        written = build_all(force=args.force, jobs=args.jobs, live_reload=live_reload,
+                            strict_links=args.strict_links, profile=profile, **build_options(args))
+    except BrokenLinksError as e:
+        sys.exit(f"❌ {e} (--strict-links)")
+    if args.compress:
+        if profile is not None:
+            profile.start()
+        precompress()
+        if profile is not None:
+            profile.lap("precompress")
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(str(args.profile_pstats))
+        print(f"🧪 cProfile stats written to {args.profile_pstats} (python -m pstats {args.profile_pstats})")
+    if profile is not None:
+        report = profile.report(args.profile_top)
+        print_profile(report)
+        if args.profile_json:
+            write_file(args.profile_json, json.dumps(report, indent=1) + "\n")
+            print(f"🧾 Profile written to {args.profile_json}")
     print(f"✅ Built {len(written)} file(s) into {DOCS_OUT_DIR}")
 
     if args.watch:
         try:
-            watch_loop()
+            watch_loop(jobs=args.jobs, compress=args.compress, notify=publish_changes if live_reload else None,
+                       live_reload=live_reload, **build_options(args))
         except KeyboardInterrupt:
             print("👋 Stopped watching")
 
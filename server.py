@@ -1,57 +1,796 @@
 #!/usr/bin/env python3
+"""
+AXL Web: local dev / preview server for `site/`.
+
+Serves over HTTP/1.1 with persistent connections, handing each connection
+to a bounded pool of worker threads, so a page's assets load in parallel
+and several people can preview at once.
+
+Responses carry ETag/Last-Modified validators and answer conditional
+requests with 304. Cache-Control comes from a per-path policy: vendored
+assets are cached for a year, HTML is revalidated on every view. `--dev`
+switches back to `no-store` for everything.
+
+Precompressed `.br`/`.gz` siblings written by build_docs.py are served
+when the client accepts them; nothing is compressed on the fly.
+
+`--cache-mb N` keeps up to N MB of small files in memory (checked against
+the file's mtime on every request) and sends large files with sendfile().
+
+`/__metrics` reports request counts, latency histograms and bytes sent per
+status and path prefix, plus file-cache hit rates, in Prometheus text
+format. Counters are per thread, so recording takes no lock. The access
+log is written in batches from a background thread (`--no-access-log`
+turns it off).
+
+`/__livereload` is a Server-Sent Events stream of the output paths each
+`build_docs.py --watch` rebuild changed; docs pages built with live reload
+use it to reload themselves, so `--dev` is not needed to see edits. The
+build either runs in this process (`--watch`) or in its own, handing over
+changes through `site/.livereload.json`.
+
+Usage:
+  python server.py                            # http://localhost:8000, opens a browser
+  python server.py --port 9000 --bind 0.0.0.0 --threads 32 --no-open
+  python server.py --dev                      # never let the browser cache
+  python server.py --cache-mb 64              # serve from memory / sendfile
+  python server.py --watch                    # also rebuild docs on changes and live-reload pages
+  python server.py --watch --build-args '--css external --nav-mode lazy'  # same options as the build
+  python server.py --no-access-log            # quiet; see /__metrics instead
+  python server.py --cache-policy 'img/*=public, max-age=86400'
+"""
+import argparse
+import bisect
+import datetime
+import email.utils
+import fnmatch
+import functools
+import http
 import http.server
-import socketserver
+import io
+import json
 import os
+import queue
+import shlex
+import stat
+import threading
+import time
+import urllib.parse
 import webbrowser
-import signal
 import socket
 import sys
-from urllib.parse import urlparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 PORT = 8000
 DIRECTORY = "site"
+THREADS = 16
+# Idle keep-alive connections are closed after this many seconds. Each one
+# holds a pool worker while it waits, so this stays short: long enough to
+# reuse the connection for a page's assets, short enough that a few idle
+# browsers cannot starve everyone else.
+KEEPALIVE_TIMEOUT = 2
+# Once a request line has arrived, reading the rest of it and sending the
+# response may block this long, so slow clients still get large files.
+REQUEST_TIMEOUT = 60
+# With --cache-mb, files up to this size are kept in memory; larger ones are sendfile()d.
+MAX_CACHED_FILE = 256 * 1024
+
+# Server-Sent Events endpoint for live reload, and the file through which a
+# build_docs.py running in another process publishes its changes.
+LIVE_RELOAD_URL = "/__livereload"
+LIVE_RELOAD_FILE = ".livereload.json"
+# Seconds between checks of LIVE_RELOAD_FILE, and between keep-alive
+# comments on idle streams (which is also how closed tabs are noticed)
+LIVE_RELOAD_POLL = 0.25
+LIVE_RELOAD_PING = 15
+
+METRICS_URL = "/__metrics"
+# Path prefixes metrics are broken down by, first match wins; anything else counts as "/".
+# A fixed list keeps the number of label values bounded whatever gets requested.
+METRIC_PREFIXES = ("/docs/assets/", "/docs/search/", "/docs/", "/vendor/", "/__")
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Seconds between access-log flushes
+ACCESS_LOG_INTERVAL = 0.5
+
+DEV_CACHE_CONTROL = 'no-store, no-cache, must-revalidate'
+# (glob on the URL path without its leading "/", Cache-Control); first match wins.
+CACHE_POLICIES = [
+    (LIVE_RELOAD_URL.lstrip("/"), "no-store"),
+    (METRICS_URL.lstrip("/"), "no-store"),
+    ("vendor/*", "public, max-age=31536000, immutable"),
+    # content-hashed stylesheets from `build_docs.py --css external`
+    ("docs/assets/*", "public, max-age=31536000, immutable"),
+    ("*.html", "no-cache"),
+    ("*", "no-cache"),
+]
+
+
+# Suffixes build_docs.py may precompress (keep in sync with its COMPRESS_SUFFIXES),
+# and the siblings to look for, best first.
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".svg", ".js", ".json", ".xml"}
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def file_etag(st, encoding=None):
+    """Strong validator from size and mtime; changes whenever a rebuild rewrites the file."""
+    if encoding:
+        return f'"{st.st_mtime_ns:x}-{st.st_size:x}-{encoding}"'
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def accepted_encodings(header):
+    """Content codings the client accepts (q > 0), from an Accept-Encoding header."""
+    accepted, rejected = set(), set()
+    wildcard = False
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name == "*":
+            wildcard = q > 0
+        elif name:
+            (accepted if q > 0 else rejected).add(name)
+    if wildcard:
+        accepted |= {name for name, _ in PRECOMPRESSED} - rejected
+    return accepted
+
+
+def parse_cache_policy(spec):
+    pattern, sep, value = spec.partition("=")
+    if not sep or not pattern or not value:
+        raise argparse.ArgumentTypeError(f"expected PATTERN=CACHE-CONTROL, got {spec!r}")
+    return pattern.lstrip("/"), value.strip()
+
+
+class FileCache:
+    """Bounded in-memory cache of small files, evicting least recently used by total bytes.
+
+    Entries are checked against the file's current mtime and size on every
+    lookup, so a rebuild is picked up on the next request. Files larger than
+    `max_file_bytes` are never cached; the handler sendfile()s them instead.
+    """
+
+    def __init__(self, max_bytes, max_file_bytes=MAX_CACHED_FILE):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = min(max_file_bytes, max_bytes)
+        self.total = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # path -> (mtime_ns, size, data)
+        self._lock = threading.Lock()
+
+    def open(self, path):
+        st = os.stat(path)
+        if not stat.S_ISREG(st.st_mode):
+            raise IsADirectoryError(path)
+        if st.st_size > self.max_file_bytes:
+            f = open(path, 'rb')
+            return f, os.fstat(f.fileno())
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return io.BytesIO(entry[2]), st
+            self.misses += 1
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        if len(data) == st.st_size:
+            self._store(path, (st.st_mtime_ns, st.st_size, data))
+        return io.BytesIO(data), st
+
+    def _store(self, path, entry):
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.total -= len(old[2])
+            self._entries[path] = entry
+            self.total += len(entry[2])
+            while self.total > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total -= len(evicted[2])
+
+
+def metric_prefix(path):
+    for prefix in METRIC_PREFIXES:
+        if path.startswith(prefix):
+            return prefix
+    return "/"
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+class Metrics:
+    """Request counters and latency histograms, served at METRICS_URL.
+
+    Each thread records into its own shard, so the request path takes no
+    lock; render() adds the shards up when scraped. With a fixed thread
+    pool there are at most as many shards as threads.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()  # only taken when a thread creates its shard
+        self.started = time.time()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            # (prefix, status) -> per-bucket counts, +Inf bucket last, then the sum of seconds
+            shard = self._local.shard = {"latency": {}, "bytes": {}, "encodings": {}}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, path, status, seconds, sent, encoding=None):
+        shard = self._shard()
+        prefix = metric_prefix(path)
+        key = (prefix, status)
+        histogram = shard["latency"].get(key)
+        if histogram is None:
+            histogram = shard["latency"][key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram[-1] += seconds
+        shard["bytes"][prefix] = shard["bytes"].get(prefix, 0) + sent
+        if encoding:
+            shard["encodings"][encoding] = shard["encodings"].get(encoding, 0) + 1
+
+    def _totals(self):
+        latency, sent, encodings = {}, {}, {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict() copies are atomic under the GIL, so recording can carry on meanwhile
+            for key, histogram in dict(shard["latency"]).items():
+                total = latency.setdefault(key, [0] * len(histogram))
+                for i, value in enumerate(list(histogram)):
+                    total[i] += value
+            for prefix, n in dict(shard["bytes"]).items():
+                sent[prefix] = sent.get(prefix, 0) + n
+            for encoding, n in dict(shard["encodings"]).items():
+                encodings[encoding] = encodings.get(encoding, 0) + n
+        return latency, sent, encodings
+
+    def render(self, file_cache=None, live_reload=None):
+        """All metrics in the Prometheus text exposition format."""
+        latency, sent, encodings = self._totals()
+        out = []
+
+        def metric(name, kind, help_text):
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        metric("axl_http_requests_total", "counter", "Requests served, by path prefix and status.")
+        for (prefix, status), histogram in sorted(latency.items()):
+            out.append(f"axl_http_requests_total{_labels(prefix=prefix, status=status)} {sum(histogram[:-1])}")
+        metric("axl_http_request_duration_seconds", "histogram",
+               "Time from parsing the request line to the end of the response.")
+        for (prefix, status), histogram in sorted(latency.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), histogram):
+                cumulative += count
+                labels = _labels(prefix=prefix, status=status, le=bound)
+                out.append(f"axl_http_request_duration_seconds_bucket{labels} {cumulative}")
+            labels = _labels(prefix=prefix, status=status)
+            out.append(f"axl_http_request_duration_seconds_sum{labels} {histogram[-1]:.6f}")
+            out.append(f"axl_http_request_duration_seconds_count{labels} {cumulative}")
+        metric("axl_http_response_bytes_total", "counter", "Response body bytes sent, by path prefix.")
+        for prefix, n in sorted(sent.items()):
+            out.append(f"axl_http_response_bytes_total{_labels(prefix=prefix)} {n}")
+        metric("axl_http_precompressed_responses_total", "counter", "Responses served from a .br/.gz sibling.")
+        for encoding, n in sorted(encodings.items()):
+            out.append(f"axl_http_precompressed_responses_total{_labels(encoding=encoding)} {n}")
+        if file_cache is not None:
+            metric("axl_file_cache_hits_total", "counter", "In-memory file cache hits.")
+            out.append(f"axl_file_cache_hits_total {file_cache.hits}")
+            metric("axl_file_cache_misses_total", "counter", "In-memory file cache misses.")
+            out.append(f"axl_file_cache_misses_total {file_cache.misses}")
+            metric("axl_file_cache_bytes", "gauge", "Bytes held by the in-memory file cache.")
+            out.append(f"axl_file_cache_bytes {file_cache.total}")
+        if live_reload is not None:
+            metric("axl_livereload_clients", "gauge", "Open live-reload event streams.")
+            out.append(f"axl_livereload_clients {live_reload.clients}")
+        metric("axl_process_start_time_seconds", "gauge", "Start time of the server, in Unix seconds.")
+        out.append(f"axl_process_start_time_seconds {self.started:.3f}")
+        return "\n".join(out) + "\n"
+
+
+class AccessLog:
+    """Access-log lines, written by a background thread in one batch per ACCESS_LOG_INTERVAL.
+
+    Request threads only append to a queue, so logging costs no syscall
+    on the request path.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stderr
+        self._queue = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def write(self, line):
+        self._queue.put(line)
+
+    def flush(self):
+        lines = []
+        try:
+            while True:
+                lines.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+
+    def _run(self):
+        while not self._stop.wait(ACCESS_LOG_INTERVAL):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+
+class LiveReload:
+    """Server-Sent Events hub behind LIVE_RELOAD_URL.
+
+    Subscribed sockets are detached from the pool thread that accepted
+    them and kept here, so open tabs do not tie up workers. publish() sends
+    every subscriber a `change` event whose data is the JSON list of
+    changed URL paths. A background thread picks up changes a build in
+    another process wrote to `watch_file` and pings idle streams.
+    """
+
+    def __init__(self, watch_file=None):
+        self.watch_file = watch_file
+        self._clients = []
+        self._lock = threading.Lock()
+        self._last_id = self._read()[0]  # changes from before we started are old news
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="livereload", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for sock in clients:
+            sock.close()
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def subscribe(self, sock):
+        sock.settimeout(2)  # a stalled tab must not hold up the others
+        with self._lock:
+            self._clients.append(sock)
+
+    def publish(self, paths):
+        self._send(f"event: change\ndata: {json.dumps(list(paths))}\n\n".encode())
+
+    def _send(self, data):
+        with self._lock:
+            clients = list(self._clients)
+        dead = []
+        for sock in clients:
+            try:
+                sock.sendall(data)
+            except OSError:
+                dead.append(sock)
+        if dead:
+            with self._lock:
+                self._clients = [sock for sock in self._clients if sock not in dead]
+            for sock in dead:
+                sock.close()
+
+    def _read(self):
+        """(id, paths) from `watch_file`, or (None, []) if there is nothing to read."""
+        if self.watch_file is None:
+            return None, []
+        try:
+            with open(self.watch_file, encoding="utf-8") as f:
+                data = json.load(f)
+            return data["id"], data["paths"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, []
+
+    def _run(self):
+        idle = 0.0
+        while not self._stop.wait(LIVE_RELOAD_POLL):
+            change_id, paths = self._read()
+            if change_id is not None and change_id != self._last_id:
+                self._last_id = change_id
+                self.publish(paths)
+                idle = 0.0
+                continue
+            idle += LIVE_RELOAD_POLL
+            if idle >= LIVE_RELOAD_PING:
+                self._send(b": ping\n\n")
+                idle = 0.0
+
 
 class Handler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DIRECTORY, **kwargs)
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+
+    def __init__(self, *args, directory=DIRECTORY, cache_policies=None, dev=False, file_cache=None,
+                 live_reload=None, metrics=None, access_log=None, **kwargs):
+        # Set before super().__init__(), which handles the request right away
+        self.cache_policies = CACHE_POLICIES if cache_policies is None else cache_policies
+        self.dev = dev
+        self.file_cache = file_cache
+        self.live_reload = live_reload
+        self.metrics = metrics
+        self.access_log = access_log
+        super().__init__(*args, directory=directory, **kwargs)
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle's
+        # algorithm holds the body back until the client's delayed ACK (~40 ms).
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle_one_request(self):
+        # Only the wait for the next request line gets the short idle
+        # timeout; parse_request() lifts it for the request itself.
+        self.connection.settimeout(KEEPALIVE_TIMEOUT)
+        # Per-request state for metrics; parse_request() starts the clock, so
+        # time spent waiting on an idle keep-alive connection is not counted.
+        self.started = None
+        self.status = None
+        self.body_size = self.sent = 0
+        self.encoding = None
+        super().handle_one_request()
+        if self.metrics is not None and self.started is not None and self.status is not None:
+            # self.path is unset if the request line was malformed (answered with a 400)
+            self.metrics.observe(urllib.parse.urlsplit(getattr(self, "path", "")).path, self.status,
+                                 time.perf_counter() - self.started, self.sent, self.encoding)
+
+    def parse_request(self):
+        self.started = time.perf_counter()
+        self.connection.settimeout(REQUEST_TIMEOUT)
+        return super().parse_request()
+
+    def log_request(self, code='-', size='-'):
+        if isinstance(code, http.HTTPStatus):
+            code = code.value
+        self.status = code
+        if self.access_log is not None:
+            super().log_request(code, size)
+
+    def log_message(self, format, *args):
+        line = "%s - - [%s] %s\n" % (self.address_string(), self.log_date_time_string(), format % args)
+        if self.access_log is not None:
+            self.access_log.write(line)
+        else:
+            sys.stderr.write(line)  # errors still get through with the access log off
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if self.live_reload is not None and path == LIVE_RELOAD_URL:
+            self.send_event_stream()
+            return
+        if self.metrics is not None and path == METRICS_URL:
+            self.send_metrics()
+            return
+        super().do_GET()
+
+    def send_metrics(self):
+        body = self.metrics.render(self.file_cache, self.live_reload).encode()
+        self.send_response(http.HTTPStatus.OK)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.sent = len(body)
+
+    def send_event_stream(self):
+        """Answer with an open-ended event stream and hand the socket to the LiveReload hub."""
+        self.send_response(http.HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(b"retry: 1000\n\n")
+        self.close_connection = True
+        self.server.detach(self.connection)
+        self.live_reload.subscribe(self.connection)
+
+    def cache_control(self):
+        if self.dev:
+            return DEV_CACHE_CONTROL
+        # No path yet when send_error() answers a malformed request line
+        path = urllib.parse.urlsplit(getattr(self, "path", "")).path.lstrip("/")
+        for pattern, value in self.cache_policies:
+            if fnmatch.fnmatchcase(path, pattern):
+                return value
+        return "no-cache"
 
     def end_headers(self):
         # Add CORS headers
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        self.send_header('Cache-Control', self.cache_control())
         return super().end_headers()
 
-def is_port_in_use(port):
+    def not_modified(self, etag, mtime):
+        """Whether the client's validators match; If-None-Match wins over If-Modified-Since."""
+        inm = self.headers.get("If-None-Match")
+        if inm is not None:
+            tags = [t.strip() for t in inm.split(",")]
+            # weak comparison, as RFC 9110 asks for If-None-Match
+            return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+        ims = self.headers.get("If-Modified-Since")
+        if ims is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(ims)
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        modified = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc).replace(microsecond=0)
+        return modified <= since
+
+    def open_file(self, path):
+        """Open `path` for sending; returns (file object, stat result).
+
+        With a FileCache, small files come back as in-memory BytesIO bodies
+        and cache hits cost a stat() but no open() or read().
+        """
+        if self.file_cache is not None:
+            return self.file_cache.open(path)
+        f = open(path, 'rb')
+        try:
+            return f, os.fstat(f.fileno())
+        except:
+            f.close()
+            raise
+
+    def copyfile(self, source, outputfile):
+        if isinstance(source, io.BytesIO):
+            outputfile.write(source.getbuffer())
+        elif self.file_cache is not None:
+            # the socket is unbuffered (wbufsize = 0), so the headers are already out
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+        self.sent = self.body_size
+
+    def open_precompressed(self, path, f, fs):
+        """Swap `f` for a precompressed sibling the client accepts, if one is fresh.
+
+        build_docs.py gives siblings their source's mtime; any other mtime
+        means the source changed since and the sibling is stale.
+        Returns (file, stat, encoding or None).
+        """
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            try:
+                sibling, sibling_fs = self.open_file(path + suffix)
+            except OSError:
+                continue
+            if sibling_fs.st_mtime_ns != fs.st_mtime_ns:
+                sibling.close()
+                continue
+            f.close()
+            return sibling, sibling_fs, encoding
+        return f, fs, None
+
+    def send_head(self):
+        """SimpleHTTPRequestHandler.send_head() plus ETag and If-None-Match.
+
+        Redirects, directory listings and errors are left to the base class.
+        """
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith("/"):
+                return super().send_head()
+            for index in ("index.html", "index.htm"):
+                if os.path.isfile(os.path.join(path, index)):
+                    path = os.path.join(path, index)
+                    break
+            else:
+                return super().send_head()
+        if path.endswith("/"):
+            return super().send_head()
+        try:
+            f, fs = self.open_file(path)
+        except OSError:
+            self.send_error(http.HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        try:
+            negotiable = os.path.splitext(path)[1] in COMPRESSIBLE_SUFFIXES
+            encoding = None
+            if negotiable:
+                f, fs, encoding = self.open_precompressed(path, f, fs)
+            etag = file_etag(fs, encoding)
+            if self.not_modified(etag, fs.st_mtime):
+                self.send_response(http.HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                if negotiable:
+                    self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                f.close()
+                return None
+            self.body_size = fs.st_size
+            self.encoding = encoding
+            self.send_response(http.HTTPStatus.OK)
+            self.send_header("Content-type", self.guess_type(path))
+            self.send_header("Content-Length", str(fs.st_size))
+            self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+            self.send_header("ETag", etag)
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            if negotiable:
+                self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return f
+        except:
+            f.close()
+            raise
+
+
+class PooledHTTPServer(http.server.ThreadingHTTPServer):
+    """ThreadingHTTPServer that runs connections on a fixed-size thread pool.
+
+    Connections beyond the pool size wait in the pool's queue instead of
+    each getting a new thread.
+    """
+
+    def __init__(self, server_address, handler_class, threads=THREADS):
+        super().__init__(server_address, handler_class)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+        self._detached = set()
+        self._detached_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def detach(self, request):
+        """Keep `request`'s socket open after its handler returns; the caller now owns it."""
+        with self._detached_lock:
+            self._detached.add(request)
+
+    def shutdown_request(self, request):
+        with self._detached_lock:
+            if request in self._detached:
+                self._detached.discard(request)
+                return
+        super().shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def is_port_in_use(port, host='localhost'):
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
+        return s.connect_ex((host or 'localhost', port)) == 0
 
-def run_server():
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the AXL site locally")
+    parser.add_argument("--port", "-p", type=int, default=PORT, help=f"Port to listen on (default: {PORT})")
+    parser.add_argument("--bind", "-b", default="", metavar="ADDRESS",
+                        help="Address to bind (default: all interfaces)")
+    parser.add_argument("--threads", "-t", type=int, default=THREADS,
+                        help=f"Worker threads, i.e. connections served at once (default: {THREADS})")
+    parser.add_argument("--directory", "-d", default=DIRECTORY, help=f"Folder to serve (default: {DIRECTORY})")
+    parser.add_argument("--open", action=argparse.BooleanOptionalAction, default=True,
+                        help="Open the site in a browser (default: yes)")
+    parser.add_argument("--cache-policy", type=parse_cache_policy, action="append", default=[],
+                        metavar="PATTERN=VALUE",
+                        help="Cache-Control for URL paths matching PATTERN; checked before the defaults (repeatable)")
+    parser.add_argument("--cache-mb", type=float, default=0, metavar="MB",
+                        help="Keep up to MB megabytes of small files in memory and sendfile() large ones (default: off)")
+    parser.add_argument("--dev", action="store_true",
+                        help=f"Send '{DEV_CACHE_CONTROL}' on every response")
+    parser.add_argument("--live-reload", action=argparse.BooleanOptionalAction, default=True,
+                        help=f"Serve the {LIVE_RELOAD_URL} event stream (default: yes)")
+    parser.add_argument("--metrics", action=argparse.BooleanOptionalAction, default=True,
+                        help=f"Serve request metrics at {METRICS_URL} (default: yes)")
+    parser.add_argument("--access-log", action=argparse.BooleanOptionalAction, default=True,
+                        help="Log each request to stderr, in batches from a background thread (default: yes)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Build the docs, then rebuild them on changes in this process (see build_docs.py --watch)")
+    parser.add_argument("--build-args", default="", metavar="ARGS",
+                        help="With --watch, build_docs.py options for those builds, e.g. \"--css external --nav-mode lazy\"")
+    return parser.parse_args(argv)
+
+
+def start_docs_watch(live_reload, directory, build_args=""):
+    """Build the docs now and keep rebuilding them on a background thread.
+
+    `build_args` are build_docs.py options (--css, --nav-mode, ...), so the
+    watch builds match how the site was built. Pages render on this process
+    only: forking a process pool from the threaded server can deadlock.
+    """
+    import build_docs
+
+    if os.path.realpath(directory) != os.path.realpath(build_docs.SITE_DIR):
+        print(f"\n❌ --watch builds into {build_docs.SITE_DIR}, but --directory serves {os.path.abspath(directory)}")
+        sys.exit(1)
+    args = build_docs.build_parser().parse_args(shlex.split(build_args))
+    options = build_docs.build_options(args)
+    enabled = live_reload is not None
+    build_docs.build_all(jobs=1, live_reload=enabled, **options)
+    if args.compress:
+        build_docs.precompress()
+    notify = live_reload.publish if enabled else None
+    thread = threading.Thread(target=build_docs.watch_loop, name="docs-watch", daemon=True,
+                              kwargs={"jobs": 1, "compress": args.compress, "notify": notify,
+                                      "live_reload": enabled, **options})
+    thread.start()
+    return thread
+
+
+def run_server(argv=None):
+    args = parse_args(argv)
     # Change to the directory containing the server script
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    
+
     # Check if port is in use
-    if is_port_in_use(PORT):
-        print(f"\n❌ Port {PORT} is already in use!")
+    if is_port_in_use(args.port, args.bind):
+        print(f"\n❌ Port {args.port} is already in use!")
         print("Please either:")
-        print(f"  1. Kill the process using port {PORT}:")
-        print(f"     sudo lsof -i :{PORT}  # to find the process")
+        print(f"  1. Kill the process using port {args.port}:")
+        print(f"     sudo lsof -i :{args.port}  # to find the process")
         print(f"     kill <PID>            # to kill it")
-        print("  2. Or use a different port by changing PORT in server.py")
+        print("  2. Or use a different port: python server.py --port <PORT>")
         sys.exit(1)
-    
+
+    file_cache = FileCache(int(args.cache_mb * 1024 * 1024)) if args.cache_mb > 0 else None
+    live_reload = None
+    if args.live_reload:
+        # With --watch the build publishes directly; the file is for builds in other processes
+        watch_file = None if args.watch else os.path.join(args.directory, LIVE_RELOAD_FILE)
+        live_reload = LiveReload(watch_file).start()
+    if args.watch:
+        start_docs_watch(live_reload, args.directory, args.build_args)
+    metrics = Metrics() if args.metrics else None
+    access_log = AccessLog().start() if args.access_log else None
+    handler = functools.partial(Handler, directory=args.directory, file_cache=file_cache,
+                                cache_policies=args.cache_policy + CACHE_POLICIES, dev=args.dev,
+                                live_reload=live_reload, metrics=metrics, access_log=access_log)
     # Create the server with socket reuse option
-    socketserver.TCPServer.allow_reuse_address = True
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
-        print(f"\n🚀 Starting server at http://localhost:{PORT}")
-        print("📂 Serving files from:", os.getcwd())
+    PooledHTTPServer.allow_reuse_address = True
+    with PooledHTTPServer((args.bind, args.port), handler, threads=args.threads) as httpd:
+        url = f"http://{args.bind or 'localhost'}:{args.port}"
+        print(f"\n🚀 Starting server at {url} ({args.threads} threads, HTTP/1.1 keep-alive)")
+        print("📂 Serving files from:", os.path.abspath(args.directory))
         print("\n📝 Available pages:")
-        print("  • http://localhost:8000/")
+        print(f"  • {url}/")
+        print(f"  • {url}/docs/")
         print("\n🛑 Press Ctrl+C to stop the server\n")
-        
+
         # Open the default browser
-        webbrowser.open(f'http://localhost:{PORT}')
-        
+        if args.open:
+            webbrowser.open(url)
+
         # Start the server
         try:
             httpd.serve_forever()
@@ -60,7 +799,12 @@ def run_server():
             # Shutdown the server gracefully
             httpd.shutdown()
             httpd.server_close()
+            if live_reload is not None:
+                live_reload.close()
+            if access_log is not None:
+                access_log.close()
             print("✅ Server stopped")
 
+
 if __name__ == "__main__":
-    run_server() 
\ No newline at end of file
+    run_server()